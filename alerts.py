@@ -0,0 +1,80 @@
+import os
+import re
+import time
+from collections import OrderedDict
+
+DIGEST_INTERVAL = float(os.getenv('ERROR_DIGEST_INTERVAL', 600))
+MAX_FINGERPRINTS = 100
+NUMBERS = re.compile(r'\d+')
+
+
+def fingerprint(error):
+    """Отпечаток ошибки: тип и текст без чисел."""
+    return f'{type(error).__name__}: {NUMBERS.sub("N", str(error))}'
+
+
+class ErrorRecord:
+    __slots__ = ('error', 'first_seen', 'last_sent', 'total', 'unsent')
+
+    def __init__(self, error, now):
+        self.error = error
+        self.first_seen = now
+        self.last_sent = now
+        self.total = 1
+        self.unsent = 0
+
+
+def minutes(seconds):
+    return f'{max(1, round(seconds / 60))} мин'
+
+
+class ErrorAggregator:
+    """Сводка повторяющихся сбоев вместо сообщения на каждый цикл.
+
+    Первая ошибка с новым отпечатком отправляется сразу, повторы
+    копятся и уходят сводкой не чаще раза в ``digest_interval`` секунд,
+    а после успешного цикла приходит сообщение о восстановлении.
+    Хранится не больше ``max_fingerprints`` отпечатков.
+    """
+
+    def __init__(self, digest_interval=DIGEST_INTERVAL,
+                 max_fingerprints=MAX_FINGERPRINTS, clock=time.monotonic):
+        self.digest_interval = digest_interval
+        self.max_fingerprints = max_fingerprints
+        self.clock = clock
+        self.records = OrderedDict()
+        self.suppressed = 0
+
+    def report(self, error):
+        """Текст для отправки или ``None``, если сбой нужно придержать."""
+        now = self.clock()
+        key = fingerprint(error)
+        record = self.records.get(key)
+        if record is None:
+            self.records[key] = ErrorRecord(error, now)
+            while len(self.records) > self.max_fingerprints:
+                self.records.popitem(last=False)
+            return f'Сбой в работе программы: {error}'
+        self.records.move_to_end(key)
+        record.error = error
+        record.total += 1
+        record.unsent += 1
+        if now - record.last_sent < self.digest_interval:
+            self.suppressed += 1
+            return None
+        message = (f'Сбой в работе программы: {error}. Тот же сбой '
+                   f'×{record.unsent} за {minutes(now - record.last_sent)}')
+        record.last_sent = now
+        record.unsent = 0
+        return message
+
+    def resolve(self):
+        """Сообщение о восстановлении после серии сбоев."""
+        if not self.records:
+            return None
+        now = self.clock()
+        total = sum(record.total for record in self.records.values())
+        started = min(record.first_seen for record in self.records.values())
+        self.records.clear()
+        return (f'Работа программы восстановлена. '
+                f'Сбоев: {total} за {minutes(now - started)}')
@@ -0,0 +1,182 @@
+import asyncio
+import functools
+import logging
+import os
+
+import homework
+from alerts import ErrorAggregator
+from delivery import OutboundQueue, pooled_bot
+from log import setup_logging
+from metrics import QUEUE_DEPTH
+from outbox import Outbox
+from practicum import PracticumClient
+from scheduler import FixedScheduler, create_scheduler
+from state import StateStore
+
+QUEUE_SIZE = int(os.getenv('ASYNC_QUEUE_SIZE', 100))
+SENDERS = int(os.getenv('ASYNC_SENDERS', 1))
+
+
+async def run_blocking(func, *args):
+    """Запуск блокирующей функции в пуле потоков."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+def consume(response):
+    """Разбор ответа: изменившиеся работы с сообщениями, ошибка и курсор.
+
+    Выполняется в пуле потоков: при ``STREAM_RESPONSES`` тело ответа
+    читается из сети по мере разбора. Если работа в середине ответа
+    не разбирается, возвращаются работы до неё и сама ошибка: сообщения
+    о них всё равно нужно отправить. ``current_date`` берётся после
+    списка работ, когда поток уже прочитан.
+    """
+    rendered = []
+    error = None
+    try:
+        for pair in homework.render_statuses(homework.diff_statuses(
+                homework.to_records(homework.check_response(response)))):
+            rendered.append(pair)
+    except Exception as exception:
+        error = exception
+    return rendered, error, response['current_date']
+
+
+class AsyncPoller:
+    """Опрос API, разбор ответов и отправка сообщений как отдельные задачи.
+
+    Стадии связаны ограниченными очередями: когда отправка не успевает,
+    заполненная очередь приостанавливает разбор, а затем и опрос.
+    С ``store`` курсор и статусы переживают перезапуск; они сохраняются
+    только после того, как сообщения ответа отправлены или записаны в
+    журнал ``OutboundQueue``, а статус — только если его сообщение ушло.
+    """
+
+    def __init__(self, bot, current_timestamp=1,
+                 retry_time=homework.RETRY_TIME, queue_size=QUEUE_SIZE,
+                 senders=SENDERS, scheduler=None, store=None):
+        self.bot = bot
+        self.store = store
+        self.delivered = []
+        if store is not None:
+            current_timestamp = store.get_cursor(default=current_timestamp)
+            homework.OLD_STATUSES.update(store.load_statuses())
+        self.current_timestamp = current_timestamp
+        self.scheduler = scheduler or FixedScheduler(retry_time)
+        self.scheduler.seed(homework.OLD_STATUSES)
+        self.senders = senders
+        self.alerts = ErrorAggregator()
+        self.responses = asyncio.Queue(maxsize=queue_size)
+        self.messages = asyncio.Queue(maxsize=queue_size)
+        QUEUE_DEPTH.labels('responses').set_function(self.responses.qsize)
+        QUEUE_DEPTH.labels('messages').set_function(self.messages.qsize)
+
+    async def poll(self, cycles=None):
+        """Опрос API с интервалом, который выбирает планировщик."""
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            cycle += 1
+            try:
+                response = await run_blocking(
+                    homework.get_api_answer,
+                    homework.window_start(self.current_timestamp))
+                await self.responses.put(response)
+            except Exception as error:
+                self.scheduler.record_error(error)
+                await self.alert(self.alerts.report(error))
+            if cycles is None or cycle < cycles:
+                await asyncio.sleep(self.scheduler.next_delay())
+
+    async def alert(self, message):
+        """Сообщение о сбое или восстановлении, если его нужно отправить."""
+        if message is not None:
+            await self.messages.put((message, None))
+
+    async def parse(self):
+        """Разбор ответов API в текст сообщений."""
+        while True:
+            response = await self.responses.get()
+            try:
+                rendered, failure, current_date = await run_blocking(
+                    consume, response)
+                self.current_timestamp = max(
+                    self.current_timestamp, current_date)
+                changes = []
+                for homework_item, message in rendered:
+                    await self.messages.put((message, homework_item))
+                    homework.remember_status(homework_item)
+                    changes.append(homework_item)
+                await self.messages.join()
+                delivered, self.delivered = self.delivered, []
+                await run_blocking(self.save, delivered)
+                if failure is not None:
+                    raise failure
+                self.scheduler.record(changes)
+                await self.alert(self.alerts.resolve())
+            except Exception as error:
+                await self.alert(self.alerts.report(error))
+            finally:
+                self.responses.task_done()
+
+    def save(self, delivered=()):
+        """Очистка старых отметок и фиксация курсора и статусов."""
+        homework.commit_messages(self.bot)
+        homework.prune_statuses(self.current_timestamp, self.store)
+        if self.store is not None:
+            for homework_item in delivered:
+                self.store.set_status(homework_item)
+            self.store.set_cursor(self.current_timestamp)
+            self.store.flush()
+
+    async def deliver(self):
+        """Отправка сообщений в Telegram."""
+        while True:
+            message, homework_item = await self.messages.get()
+            try:
+                sent = await run_blocking(
+                    homework.send_message, self.bot, message)
+                if sent and homework_item is not None:
+                    self.delivered.append(homework_item)
+            finally:
+                self.messages.task_done()
+
+    async def run(self, cycles=None):
+        """Запуск конвейера; ``cycles`` ограничивает число опросов."""
+        workers = [asyncio.create_task(self.parse())]
+        workers += [asyncio.create_task(self.deliver())
+                    for _ in range(self.senders)]
+        try:
+            await self.poll(cycles)
+            await self.responses.join()
+            await self.messages.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+def main():
+    """Асинхронная точка входа бота."""
+    if not homework.check_tokens():
+        logging.error('Программа принудительно остановлена.')
+        raise Exception('Программа принудительно остановлена.')
+    homework.api_client = PracticumClient()
+    bot = OutboundQueue(
+        pooled_bot(homework.TELEGRAM_TOKEN), outbox=Outbox()).start()
+    QUEUE_DEPTH.labels('outbound').set_function(bot.depth)
+    scheduler = create_scheduler(homework.RETRY_TIME)
+    try:
+        with StateStore() as store:
+            asyncio.run(AsyncPoller(
+                bot, scheduler=scheduler, store=store).run())
+    finally:
+        bot.close()
+
+
+if __name__ == '__main__':
+    listener = setup_logging()
+    try:
+        main()
+    finally:
+        listener.stop()
@@ -0,0 +1,65 @@
+"""Пропускная способность отправки при всплеске сообщений.
+
+Заглушка Telegram отвечает 429 на второе сообщение в чат быстрее, чем
+через ``CHAT_INTERVAL`` секунд. Прямая отправка через ``send_message_to``
+теряет такие сообщения, очередь ``OutboundQueue`` — склеивает и ждёт.
+
+Запуск: python benchmarks/bench_delivery.py
+"""
+import time
+
+import common  # noqa: F401
+
+import homework
+import telegram
+from delivery import OutboundQueue
+from fake_servers import FakeTelegramServer
+
+CHATS = 100
+PER_CHAT = 10
+CHAT_INTERVAL = 0.5
+LATENCY = 0.002
+
+
+def burst():
+    return [(chat, f'Сообщение {number} для чата {chat}')
+            for chat in range(CHATS) for number in range(PER_CHAT)]
+
+
+def direct(bot):
+    for chat_id, text in burst():
+        homework.send_message_to(bot, chat_id, text)
+
+
+def queued(bot):
+    with OutboundQueue(bot, chat_rate=1 / CHAT_INTERVAL, global_rate=1000,
+                       workers=8) as queue:
+        for chat_id, text in burst():
+            queue.send_message(chat_id, text)
+        queue.flush()
+    return queue
+
+
+def measure(name, run):
+    with FakeTelegramServer(chat_interval=CHAT_INTERVAL,
+                            latency=LATENCY) as telegram_api:
+        bot = telegram.Bot('1234:abcdefg', base_url=telegram_api.base_url)
+        started = time.perf_counter()
+        run(bot)
+        elapsed = time.perf_counter() - started
+    delivered = sum(text.count('Сообщение')
+                    for _, text in telegram_api.messages)
+    print(f'{name:>8} {elapsed:>8.2f} {len(telegram_api.requests):>9} '
+          f'{telegram_api.rejected:>8} {delivered:>9} '
+          f'{delivered / elapsed:>10.0f}')
+
+
+def main():
+    print(f'{"mode":>8} {"seconds":>8} {"api calls":>9} {"429":>8} '
+          f'{"delivered":>9} {"msg/s":>10}')
+    measure('direct', direct)
+    measure('queued', queued)
+
+
+if __name__ == '__main__':
+    main()
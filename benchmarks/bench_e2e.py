@@ -0,0 +1,139 @@
+"""Сквозной замер конвейера на локальных заглушках Практикума и Telegram.
+
+Гоняет get_api_answer -> check_response -> parse_status -> send_message,
+печатает пропускную способность и p50/p99 каждой стадии и сохраняет
+результат в ``benchmarks/results/<commit>.json``. С ``--compare`` выводит
+разницу с ранее сохранённым результатом.
+
+Запуск: python benchmarks/bench_e2e.py --cycles 200 --compare results/X.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import time
+
+from common import ROOT, serve_in_process, summarize
+
+import homework
+import telegram
+from fake_servers import FakePracticumServer, FakeTelegramServer
+from practicum import PracticumClient
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+STAGES = ('get_api_answer', 'check_response', 'parse_status', 'send_message')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--homeworks', type=int, default=5,
+                        help='работ в каждом ответе API')
+    parser.add_argument('--api-latency', type=float, default=0.005)
+    parser.add_argument('--telegram-latency', type=float, default=0.005)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--compare', help='файл с прошлым результатом')
+    parser.add_argument('--output', default=RESULTS_DIR)
+    return parser.parse_args()
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def synthetic(count):
+    return [{'id': number, 'homework_name': f'project_{number}.zip',
+             'status': 'approved', 'date_updated': '2022-02-13T14:40:57Z',
+             'reviewer_comment': 'Всё нравится'} for number in range(count)]
+
+
+def timed(samples, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        samples.append(time.perf_counter() - started)
+
+
+def run(args, api_url, telegram_url):
+    homework.ENDPOINT = api_url + FakePracticumServer.path
+    homework.TELEGRAM_CHAT_ID = 42
+    homework.api_client = PracticumClient()
+    bot = telegram.Bot('1234:abcdefg', base_url=telegram_url + '/bot')
+    samples = {stage: [] for stage in STAGES}
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(args.cycles):
+        try:
+            response = timed(samples['get_api_answer'],
+                             homework.get_api_answer, 1)
+            homeworks = timed(samples['check_response'],
+                              homework.check_response, response)
+            for item in homeworks:
+                message = timed(samples['parse_status'],
+                                homework.parse_status, item)
+                timed(samples['send_message'],
+                      homework.send_message, bot, message)
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'commit': commit(),
+        'created': int(time.time()),
+        'params': {key: value for key, value in vars(args).items()
+                   if key not in ('compare', 'output')},
+        'elapsed_s': elapsed,
+        'errors': errors,
+        'cycles_per_s': args.cycles / elapsed,
+        'stages': {stage: summarize(values, elapsed)
+                   for stage, values in samples.items()},
+    }
+
+
+def report(result, baseline=None):
+    print(f'commit {result["commit"]}: {result["cycles_per_s"]:.1f} '
+          f'циклов/с, ошибок {result["errors"]}')
+    print(f'{"stage":>15} {"count":>6} {"op/s":>9} {"p50 ms":>8} '
+          f'{"p99 ms":>8} {"Δp50":>7} {"Δp99":>7}')
+    for stage, stats in result['stages'].items():
+        deltas = ['', '']
+        if baseline and stage in baseline['stages']:
+            old = baseline['stages'][stage]
+            deltas = [f'{(stats[key] / old[key] - 1) * 100:+.0f}%'
+                      if old[key] else ''
+                      for key in ('p50_ms', 'p99_ms')]
+        print(f'{stage:>15} {stats["count"]:>6} {stats["throughput"]:>9.0f} '
+              f'{stats["p50_ms"]:>8.2f} {stats["p99_ms"]:>8.2f} '
+              f'{deltas[0]:>7} {deltas[1]:>7}')
+
+
+def main():
+    args = parse_args()
+    homework.logging.disable(homework.logging.CRITICAL)
+    with serve_in_process(FakePracticumServer,
+                          homeworks=synthetic(args.homeworks),
+                          latency=args.api_latency,
+                          error_rate=args.error_rate) as api_url, \
+            serve_in_process(FakeTelegramServer,
+                             latency=args.telegram_latency,
+                             error_rate=args.error_rate) as telegram_url:
+        result = run(args, api_url, telegram_url)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+    report(result, baseline)
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f'{result["commit"]}.json')
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(result, file, ensure_ascii=False, indent=2)
+    print(f'результат сохранён в {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Время доставки одного вердикта 1000 подписанным чатам.
+
+Заглушка Telegram отвечает с задержкой ``LATENCY``, как удалённый API.
+Сравниваются последовательная отправка через ``send_message_to``,
+очередь с одним соединением у бота и очередь с пулом соединений.
+
+Запуск: python benchmarks/bench_fanout.py
+"""
+import time
+
+import common  # noqa: F401
+
+import homework
+import telegram
+from delivery import OutboundQueue, pooled_bot
+from fake_servers import FakeTelegramServer
+from subscriptions import Subscriptions
+
+CHATS = 1000
+LATENCY = 0.01
+WORKERS = 32
+TEXT = 'Изменился статус проверки работы "hw1". Работа проверена.'
+SUBSCRIPTIONS = Subscriptions(chats=range(CHATS))
+HOMEWORK = {'homework_name': 'hw1'}
+
+
+def sequential(base_url):
+    bot = telegram.Bot('1234:abcdefg', base_url=base_url)
+    for chat_id in SUBSCRIPTIONS.chats_for(HOMEWORK):
+        homework.send_message_to(bot, chat_id, TEXT)
+
+
+def fan_out(bot):
+    with OutboundQueue(bot, global_rate=CHATS * 10,
+                       workers=WORKERS) as queue:
+        queue.broadcast(SUBSCRIPTIONS.chats_for(HOMEWORK), TEXT)
+        queue.flush()
+
+
+def single_connection(base_url):
+    fan_out(telegram.Bot('1234:abcdefg', base_url=base_url))
+
+
+def pooled(base_url):
+    fan_out(pooled_bot('1234:abcdefg', pool_size=WORKERS,
+                       base_url=base_url))
+
+
+def measure(name, run):
+    with FakeTelegramServer(latency=LATENCY) as telegram_api:
+        started = time.perf_counter()
+        run(telegram_api.base_url)
+        elapsed = time.perf_counter() - started
+    delivered = len({chat_id for chat_id, _ in telegram_api.messages})
+    print(f'{name:>10} {elapsed:>8.2f} {delivered:>9} '
+          f'{telegram_api.connections:>11} {delivered / elapsed:>8.0f}')
+
+
+def main():
+    print(f'{"mode":>10} {"seconds":>8} {"delivered":>9} '
+          f'{"connections":>11} {"msg/s":>8}')
+    measure('sequential', sequential)
+    measure('single', single_connection)
+    measure('pooled', pooled)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Хвост задержек get_api_answer с дублирующими запросами и без них.
+
+Запуск: python benchmarks/bench_hedging.py [--requests 300]
+
+Заглушка в отдельном процессе отвечает за FAST секунд, а с
+вероятностью SLOW_SHARE — за SLOW секунд.
+"""
+import argparse
+import logging
+import random
+import time
+
+from common import percentile, serve_in_process
+
+import homework
+from fake_servers import FakePracticumServer
+from hedging import HedgedTransport
+from practicum import PracticumClient
+
+FAST = 0.005
+SLOW = 0.3
+SLOW_SHARE = 0.05
+
+
+def heavy_tail():
+    return SLOW if random.random() < SLOW_SHARE else FAST * random.uniform(
+        0.8, 1.5)
+
+
+def measure(transport, count):
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        homework.fetch_statuses(1, homework.HEADERS, transport)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--percentile', type=float, default=0.9)
+    parser.add_argument('--max-ratio', type=float, default=0.15)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with serve_in_process(FakePracticumServer, latency=heavy_tail) as url:
+        homework.ENDPOINT = url + FakePracticumServer.path
+        with PracticumClient() as client:
+            plain = measure(client, args.requests)
+        with HedgedTransport(PracticumClient(), percentile=args.percentile,
+                             initial_delay=FAST * 4,
+                             max_ratio=args.max_ratio) as hedged:
+            with_hedges = measure(hedged, args.requests)
+
+    print(f'{args.requests} запросов, медленных {SLOW_SHARE:.0%} '
+          f'по {SLOW * 1000:.0f} ms')
+    print(f'{"":12} {"p50 ms":>8} {"p99 ms":>8} {"mean ms":>8}')
+    for name, samples in (('без копий', plain), ('с копиями', with_hedges)):
+        print(f'{name:12} {percentile(samples, 0.5) * 1000:>8.1f} '
+              f'{percentile(samples, 0.99) * 1000:>8.1f} '
+              f'{sum(samples) / len(samples) * 1000:>8.1f}')
+    print(f'копий отправлено {hedged.hedges} '
+          f'({hedged.hedges / hedged.requests:.1%} нагрузки), '
+          f'выиграли {hedged.wins}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Время импорта homework и выхода при отсутствии токенов.
+
+Запуск: python benchmarks/bench_import.py [--budget-ms 100]
+
+Код возврата 1, если медиана импорта вышла за бюджет.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import ROOT
+
+REPEAT = 10
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 100))
+TOKENS = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
+
+
+def import_profile(module):
+    """Суммарное время импорта модуля и его прямых зависимостей, мс."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        rows.append((name, int(cumulative) / 1000))
+    # -X importtime печатает модуль после всех его зависимостей.
+    indent = [len(name) - len(name.lstrip()) for name, _ in rows]
+    children = []
+    for index in range(len(rows) - 2, -1, -1):
+        if indent[index] <= indent[-1]:
+            break
+        if indent[index] == indent[-1] + 2:
+            children.append((rows[index][0].strip(), rows[index][1]))
+    return rows[-1][1], children
+
+
+def wall_ms(args, env=None):
+    started = time.perf_counter()
+    subprocess.run(args, cwd=ROOT, env=env, capture_output=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    profiles = [import_profile('homework') for _ in range(REPEAT)]
+    imports = [total for total, _ in profiles]
+    env = {key: value for key, value in os.environ.items()
+           if key not in TOKENS}
+    baseline = [wall_ms([sys.executable, '-c', 'pass'])
+                for _ in range(REPEAT)]
+    exits = [wall_ms([sys.executable, 'homework.py'], env)
+             for _ in range(REPEAT)]
+
+    median = statistics.median(imports)
+    print(f'import homework        {median:8.1f} ms (медиана из {REPEAT})')
+    print(f'выход без токенов      {statistics.median(exits):8.1f} ms')
+    print(f'пустой интерпретатор   {statistics.median(baseline):8.1f} ms')
+    print('самые тяжёлые зависимости:')
+    for name, ms in sorted(profiles[-1][1], key=lambda row: -row[1])[:5]:
+        print(f'  {name:20} {ms:8.1f} ms')
+    if median > args.budget_ms:
+        print(f'Импорт дольше бюджета {args.budget_ms:.0f} ms')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Пропускная способность отправки с журналом на диске.
+
+Бот отвечает мгновенно, так что замеряется цена журнала: ``fsync`` на
+каждое сообщение против группового ``commit()`` раз в
+``OUTBOX_COMMIT_DELAY`` секунд и очередь без журнала.
+
+Запуск: python benchmarks/bench_outbox.py [--messages 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import common  # noqa: F401
+
+from delivery import OutboundQueue
+from outbox import Outbox
+
+CHATS = 1000
+
+
+class InstantBot:
+
+    def send_message(self, chat_id, text):
+        pass
+
+
+def run(messages, outbox=None, per_message=False):
+    with OutboundQueue(InstantBot(), chat_rate=messages,
+                       global_rate=messages * 10, outbox=outbox) as queue:
+        for number in range(messages):
+            queue.send_message(number % CHATS, f'Сообщение {number}')
+            if per_message:
+                queue.commit()
+        queue.flush()
+    return queue
+
+
+def measure(name, messages, **kwargs):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'outbox.jsonl')
+        outbox = Outbox(path) if kwargs.pop('durable', True) else None
+        started = time.perf_counter()
+        queue = run(messages, outbox, **kwargs)
+        elapsed = time.perf_counter() - started
+        unsent = len(Outbox(path).unsent()) if outbox else 0
+    commits = outbox.commits if outbox else 0
+    print(f'{name:>12} {elapsed:>8.2f} {queue.sent:>8} {commits:>8} '
+          f'{unsent:>7} {messages / elapsed:>8.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+    print(f'{"mode":>12} {"seconds":>8} {"calls":>8} {"fsync":>8} '
+          f'{"unsent":>7} {"msg/s":>8}')
+    measure('memory', args.messages, durable=False)
+    measure('fsync each', args.messages // 10, per_message=True)
+    measure('group', args.messages)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""parse_status в цикле против parse_statuses на 100 тысячах работ.
+
+Запуск: python benchmarks/bench_parse.py
+"""
+import logging
+import random
+import timeit
+
+import common  # noqa: F401
+
+import homework
+
+COUNT = 100000
+REPEAT = 5
+
+
+def synthetic(count):
+    statuses = list(homework.HOMEWORK_STATUSES)
+    return [{'id': number, 'homework_name': f'project_{number}.zip',
+             'status': random.choice(statuses),
+             'date_updated': '2022-02-13T14:40:57Z'}
+            for number in range(count)]
+
+
+def main():
+    logging.getLogger().handlers = [logging.NullHandler()]
+    homeworks = synthetic(COUNT)
+    single = min(timeit.repeat(
+        lambda: [homework.parse_status(item) for item in homeworks],
+        number=1, repeat=REPEAT))
+    batch = min(timeit.repeat(
+        lambda: homework.parse_statuses(homeworks),
+        number=1, repeat=REPEAT))
+    print(f'{COUNT} работ, лучший из {REPEAT} запусков')
+    print(f'parse_status   {single * 1000:8.1f} ms '
+          f'{single / COUNT * 1e9:8.0f} ns/работа')
+    print(f'parse_statuses {batch * 1000:8.1f} ms '
+          f'{batch / COUNT * 1e9:8.0f} ns/работа')
+    print(f'ускорение      {single / batch:8.1f}x')
+    records = list(homework.to_records(homeworks))
+    from_records = min(timeit.repeat(
+        lambda: homework.parse_statuses(records),
+        number=1, repeat=REPEAT))
+    print(f'из записей     {from_records * 1000:8.1f} ms '
+          f'{from_records / COUNT * 1e9:8.0f} ns/работа')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Память на миллион работ: словари из ответа API против Homework.
+
+Запуск: python benchmarks/bench_records.py [--count 1000000]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+import common  # noqa: F401
+
+from records import Homework
+
+CHUNK = 10000
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def api_chunk(size):
+    """Работы в виде JSON; json.loads каждый раз создаёт новые объекты."""
+    return json.dumps([
+        {'id': number, 'status': STATUSES[number % 3],
+         'homework_name': f'student{number}__hw05_final.zip',
+         'reviewer_comment': 'Всё хорошо, но можно лучше.',
+         'date_updated': '2022-02-13T14:40:57Z',
+         'lesson_name': 'Итоговый проект'}
+        for number in range(size)])
+
+
+def measure(count, convert):
+    body = api_chunk(CHUNK)
+    gc.collect()
+    tracemalloc.start()
+    stored = []
+    for _ in range(count // CHUNK):
+        stored.extend(convert(json.loads(body)))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, stored
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rows = (
+        ('dict', lambda chunk: chunk),
+        ('Homework', lambda chunk: map(Homework.from_dict, chunk)),
+    )
+    print(f'{args.count} работ')
+    print(f'{"":10} {"MiB":>8} {"B/работа":>9}')
+    for name, convert in rows:
+        size, stored = measure(args.count, convert)
+        print(f'{name:10} {size / 2 ** 20:>8.1f} {size / args.count:>9.0f}')
+        del stored
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Прогон записанного трафика через конвейер на максимальной скорости.
+
+Без ``--captures`` строится запись, похожая на боевую: в каждом ответе
+окно из ``--homeworks`` работ, статусы которых постепенно меняются.
+Сообщения уходят в ``NullBot``, так что замеряются только разбор и
+сравнение статусов.
+
+Запуск: python benchmarks/bench_replay.py [--captures captures.jsonl]
+"""
+import argparse
+import json
+import logging
+import time
+
+import common  # noqa: F401
+
+import homework
+from replay import NullBot, load_captures, replay
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+START = 1644760857
+
+
+def synthetic(polls, homeworks):
+    """Запись из ``polls`` ответов по ``homeworks`` работ."""
+    captures = []
+    for poll in range(polls):
+        current_date = START + poll * homework.RETRY_TIME
+        items = [
+            {'id': number, 'homework_name': f'student{number}__hw05.zip',
+             'status': STATUSES[(number + poll // 10) % 3],
+             'reviewer_comment': 'Всё хорошо, но можно лучше.',
+             'date_updated': '2022-02-13T14:40:57Z',
+             'lesson_name': 'Итоговый проект'}
+            for number in range(homeworks)]
+        captures.append({
+            'time': float(current_date),
+            'url': homework.ENDPOINT,
+            'params': {'from_date': homework.window_start(
+                current_date - homework.RETRY_TIME)},
+            'status': 200,
+            'body': json.dumps({'homeworks': items,
+                                'current_date': current_date}),
+            'elapsed': 0.2,
+        })
+    return captures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--captures')
+    parser.add_argument('--polls', type=int, default=2000)
+    parser.add_argument('--homeworks', type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.captures:
+        captures = load_captures(args.captures)
+    else:
+        captures = synthetic(args.polls, args.homeworks)
+    bot = NullBot()
+    started = time.perf_counter()
+    summary = replay(captures, bot)
+    elapsed = time.perf_counter() - started
+    print(f'{"requests":>8} {"messages":>8} {"mismatch":>8} {"seconds":>8} '
+          f'{"polls/s":>8} {"ms/poll":>8}')
+    print(f'{summary["requests"]:>8} {len(bot.messages):>8} '
+          f'{summary["mismatches"]:>8} '
+          f'{elapsed:>8.2f} {summary["requests"] / elapsed:>8.0f} '
+          f'{elapsed / summary["requests"] * 1000:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
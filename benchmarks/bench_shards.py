@@ -0,0 +1,112 @@
+"""Пропускная способность ShardSupervisor от 1 до N процессов.
+
+Запуск: python benchmarks/bench_shards.py [--tenants 64] [--homeworks 500]
+
+Заглушка Практикума работает в отдельном процессе и отдаёт заранее
+сжатый ответ, чтобы упираться в разбор JSON на стороне воркеров.
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from common import serve_in_process
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import homework
+import telegram
+from fake_servers import FakePracticumServer, PracticumHandler
+from shards import ShardSupervisor
+from tenants import Tenant, TenantRegistry
+
+WARMUP = 1.0
+DURATION = 3.0
+
+
+class StaticPracticumHandler(PracticumHandler):
+
+    def do_GET(self):
+        fake = self.fake
+        with fake.counter.get_lock():
+            fake.counter.value += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(fake.body)))
+        self.end_headers()
+        self.wfile.write(fake.body)
+
+
+class StaticPracticumServer(FakePracticumServer):
+    handler_class = StaticPracticumHandler
+
+    def __init__(self, counter, **kwargs):
+        super().__init__(**kwargs)
+        self.counter = counter
+        self.body = gzip.compress(json.dumps(
+            {'homeworks': self.homeworks,
+             'current_date': self.current_date}).encode())
+
+
+class NullBot:
+
+    def __init__(self, token=None):
+        pass
+
+    def send_message(self, chat_id, text):
+        pass
+
+
+def synthetic(count):
+    statuses = list(homework.HOMEWORK_STATUSES)
+    return [{'id': number, 'homework_name': f'project_{number}.zip',
+             'status': statuses[number % len(statuses)],
+             'date_updated': '2022-02-13T14:40:57Z'}
+            for number in range(count)]
+
+
+def measure(workers, tenants, counter, state_dir):
+    registry = TenantRegistry(
+        Tenant(f'student{i}', f'token{i}', i) for i in range(tenants))
+    path = os.path.join(state_dir, f'state{workers}.sqlite3')
+    with ShardSupervisor(registry, size=workers, retry_time=0,
+                         concurrency=4, state_path=path):
+        time.sleep(WARMUP)
+        before = counter.value
+        time.sleep(DURATION)
+        polls = counter.value - before
+    return polls / DURATION
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=64)
+    parser.add_argument('--homeworks', type=int, default=500)
+    parser.add_argument('--max-workers', type=int,
+                        default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    counter = multiprocessing.get_context('fork').Value('q', 0)
+    telegram.Bot = NullBot
+    homework.TELEGRAM_TOKEN = '1234:abcdefg'
+    counts = sorted({1, 2, 4, 8, 16, args.max_workers})
+    counts = [count for count in counts if count <= args.max_workers]
+    with serve_in_process(StaticPracticumServer, counter=counter,
+                          homeworks=synthetic(args.homeworks)) as url, \
+            tempfile.TemporaryDirectory() as state_dir:
+        homework.ENDPOINT = url + StaticPracticumServer.path
+        print(f'{args.tenants} арендаторов, {args.homeworks} работ в ответе')
+        print(f'{"workers":>8} {"polls/s":>10} {"speedup":>8}')
+        baseline = None
+        for workers in counts:
+            rate = measure(workers, args.tenants, counter, state_dir)
+            baseline = baseline or rate
+            print(f'{workers:>8} {rate:>10.1f} {rate / baseline:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Пиковая память и время до первой работы: ``status.json()`` и поток.
+
+Запуск: python benchmarks/bench_streaming.py [число работ]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import serve_in_process
+
+import homework
+from fake_servers import FakePracticumServer
+
+COUNT = 20000
+
+
+def synthetic(count):
+    return [{
+        'id': number,
+        'status': 'approved',
+        'homework_name': f'student__project_{number}.zip',
+        'reviewer_comment': 'Всё нравится, но есть пара мелочей. ' * 3,
+        'date_updated': '2022-02-13T14:40:57Z',
+        'lesson_name': 'Итоговый проект',
+    } for number in range(count)]
+
+
+def run(streaming):
+    homework.STREAM_RESPONSES = streaming
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    response = homework.get_api_answer(1)
+    for item in homework.check_response(response):
+        homework.parse_status(item)
+        if first is None:
+            first = time.perf_counter() - started
+    response['current_date']
+    total = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, first, total
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    homework.logging.disable(homework.logging.INFO)
+    with serve_in_process(FakePracticumServer,
+                          homeworks=synthetic(count)) as url:
+        homework.ENDPOINT = url + FakePracticumServer.path
+        print(f'{count} работ')
+        print(f'{"mode":>8} {"peak MiB":>9} {"first ms":>9} {"total ms":>9}')
+        for name, streaming in (('json', False), ('stream', True)):
+            peak, first, total = run(streaming)
+            print(f'{name:>8} {peak / 2 ** 20:>9.1f} {first * 1000:>9.1f} '
+                  f'{total * 1000:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
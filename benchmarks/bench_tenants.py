@@ -0,0 +1,55 @@
+"""Стоимость опроса одного арендатора при росте их числа от 1 до 1000.
+
+Запуск: python benchmarks/bench_tenants.py
+"""
+import time
+import tracemalloc
+
+import common  # noqa: F401
+
+import homework
+import telegram
+from fake_servers import FakePracticumServer, FakeTelegramServer
+from tenants import MultiTenantPoller, Tenant, TenantRegistry
+
+COUNTS = (1, 10, 100, 1000)
+CONCURRENCY = 16
+LATENCY = 0.005
+
+
+def measure(count, practicum, bot):
+    tracemalloc.start()
+    registry = TenantRegistry(
+        Tenant(f'student{i}', f'token{i}', i) for i in range(count))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    connections = practicum.connections
+    with MultiTenantPoller(registry, bot, concurrency=CONCURRENCY) as poller:
+        started = time.perf_counter()
+        poller.poll_all()
+        elapsed = time.perf_counter() - started
+    return {
+        'tenants': count,
+        'total_ms': elapsed * 1000,
+        'per_tenant_ms': elapsed * 1000 / count,
+        'per_tenant_bytes': memory / count,
+        'connections': practicum.connections - connections,
+    }
+
+
+def main():
+    with FakePracticumServer(latency=LATENCY) as practicum, \
+            FakeTelegramServer() as telegram_api:
+        homework.ENDPOINT = practicum.endpoint
+        bot = telegram.Bot('1234:abcdefg', base_url=telegram_api.base_url)
+        print(f'{"tenants":>8} {"total ms":>10} {"ms/tenant":>10} '
+              f'{"B/tenant":>9} {"conns":>6}')
+        for count in COUNTS:
+            row = measure(count, practicum, bot)
+            print(f'{row["tenants"]:>8} {row["total_ms"]:>10.1f} '
+                  f'{row["per_tenant_ms"]:>10.3f} '
+                  f'{row["per_tenant_bytes"]:>9.0f} {row["connections"]:>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import contextlib
+import multiprocessing
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'tests')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def _serve(factory, kwargs, urls, stop):
+    with factory(**kwargs) as server:
+        urls.put(server.url)
+        stop.wait()
+
+
+@contextlib.contextmanager
+def serve_in_process(factory, **kwargs):
+    """Заглушка в отдельном процессе, чтобы не мешать замерам памяти и GIL."""
+    context = multiprocessing.get_context('fork')
+    urls = context.Queue()
+    stop = context.Event()
+    process = context.Process(
+        target=_serve, args=(factory, kwargs, urls, stop), daemon=True)
+    process.start()
+    try:
+        yield urls.get(timeout=10)
+    finally:
+        stop.set()
+        process.join(timeout=5)
+
+
+def percentile(values, fraction):
+    """Перцентиль методом ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    """Сводка замеров стадии в миллисекундах."""
+    return {
+        'count': len(samples),
+        'p50_ms': percentile(samples, 0.5) * 1000,
+        'p99_ms': percentile(samples, 0.99) * 1000,
+        'mean_ms': sum(samples) / len(samples) * 1000 if samples else 0.0,
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+    }
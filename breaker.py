@@ -0,0 +1,107 @@
+import logging
+import os
+import threading
+import time
+
+from metrics import BREAKER_REJECTED, BREAKER_STATE, BREAKER_TRANSITIONS
+
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+BREAKER_RESET_TIME = float(os.getenv('BREAKER_RESET_TIME', 60))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv('BREAKER_HALF_OPEN_CALLS', 1))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Запрос не отправлен: цепь разомкнута после серии сбоев."""
+
+
+class CircuitBreaker:
+    """Автомат защиты для вызовов внешнего API.
+
+    После ``failure_threshold`` сбоев подряд цепь размыкается и вызовы
+    сразу завершаются ``CircuitOpenError``. Через ``reset_timeout``
+    пропускается ``half_open_calls`` пробных вызовов: успех замыкает
+    цепь, сбой снова размыкает её. Используется как контекстный
+    менеджер; ``is_failure`` решает, какие исключения считать сбоем.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURES,
+                 reset_timeout=BREAKER_RESET_TIME,
+                 half_open_calls=BREAKER_HALF_OPEN_CALLS,
+                 is_failure=None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure or (lambda error: True)
+        self.clock = clock
+        self.listeners = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Замыкание цепи и сброс счётчиков."""
+        with self._lock:
+            self._set_state(CLOSED)
+            self.failures = 0
+            self.opened_at = None
+            self.trials = 0
+
+    def add_listener(self, listener):
+        """``listener(breaker, old, new)`` вызывается при смене состояния."""
+        self.listeners.append(listener)
+
+    @property
+    def retry_in(self):
+        """Секунд до пробного вызова; 0, если цепь не разомкнута."""
+        if self.state != OPEN:
+            return 0
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def _set_state(self, state):
+        old = getattr(self, 'state', None)
+        self.state = state
+        BREAKER_STATE.labels(self.name).set(STATE_CODES[state])
+        if old is None or old == state:
+            return
+        BREAKER_TRANSITIONS.labels(self.name, state).inc()
+        logging.warning('Цепь %s: %s -> %s', self.name, old, state)
+        for listener in self.listeners:
+            listener(self, old, state)
+
+    def _open(self):
+        self.opened_at = self.clock()
+        self.trials = 0
+        self._set_state(OPEN)
+
+    def __enter__(self):
+        with self._lock:
+            if self.state == OPEN and self.retry_in == 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self.trials < self.half_open_calls:
+                    self.trials += 1
+                    return self
+            elif self.state == CLOSED:
+                return self
+            retry_in = self.retry_in
+        BREAKER_REJECTED.labels(self.name).inc()
+        raise CircuitOpenError(
+            f'Цепь {self.name} разомкнута, повтор через {retry_in:.0f} с')
+
+    def __exit__(self, exc_type, exc, traceback):
+        with self._lock:
+            if exc_type is not None and self.is_failure(exc):
+                self.failures += 1
+                if (self.state == HALF_OPEN
+                        or self.failures >= self.failure_threshold):
+                    self._open()
+            else:
+                self.failures = 0
+                if self.state == HALF_OPEN:
+                    self._set_state(CLOSED)
+        return False
@@ -0,0 +1,323 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from metrics import DELIVERY_FAILURES, DELIVERY_LATENCY
+from outbox import OUTBOX_COMMIT_DELAY
+
+CHAT_RATE = float(os.getenv('CHAT_RATE', 1))
+GLOBAL_RATE = float(os.getenv('GLOBAL_RATE', 30))
+SEND_RETRIES = int(os.getenv('SEND_RETRIES', 3))
+SEND_WORKERS = int(os.getenv('SEND_WORKERS', 4))
+SEND_RETRY_DELAY = float(os.getenv('SEND_RETRY_DELAY', 60))
+SEND_POOL_SIZE = int(os.getenv('SEND_POOL_SIZE', SEND_WORKERS + 4))
+MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+
+
+def pooled_bot(token, pool_size=SEND_POOL_SIZE, **kwargs):
+    """Бот с пулом HTTP-соединений на ``pool_size`` потоков отправки.
+
+    По умолчанию ``telegram.Bot`` держит одно соединение, и параллельные
+    отправки открывают и закрывают новые на каждый запрос.
+    """
+    from telegram import Bot
+    from telegram.utils.request import Request
+
+    return Bot(token, request=Request(con_pool_size=pool_size), **kwargs)
+
+
+class TokenBucket:
+    """Ведро токенов: ``rate`` отправок в секунду, запас ``capacity``."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def delay(self, now):
+        """Сколько ждать до появления токена."""
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class OutboundQueue:
+    """Очередь исходящих сообщений с ограничением частоты отправки.
+
+    Повторяет ``bot.send_message``, поэтому передаётся в ``send_message``
+    вместо бота. Лимиты действуют на каждый чат и на бота в целом;
+    накопившиеся для одного чата сообщения склеиваются в одно, а после
+    ``RetryAfter`` чат ждёт указанное Telegram время. Чаты, которым не
+    удалось доставить сообщение, собираются в ``failures``.
+
+    С ``outbox`` сообщения сначала пишутся в журнал на диске и попадают
+    в очередь только после ``commit()``: его вызывает отдельный поток
+    раз в ``commit_delay`` секунд, одним ``fsync`` на все накопившиеся
+    сообщения. Доставленные сообщения подтверждаются в журнале, а
+    неподтверждённые отправляются заново при следующем ``start()``.
+    Если все попытки отправки не удались из-за сети, сообщения
+    откладываются на ``retry_delay`` секунд и снова встают в очередь;
+    ``flush()`` и ``close()`` их не ждут — они остаются в журнале.
+    """
+
+    def __init__(self, bot, chat_rate=CHAT_RATE, global_rate=GLOBAL_RATE,
+                 workers=SEND_WORKERS, retries=SEND_RETRIES,
+                 outbox=None, commit_delay=OUTBOX_COMMIT_DELAY,
+                 retry_delay=SEND_RETRY_DELAY, clock=time.monotonic):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.global_rate = global_rate
+        self.workers = workers
+        self.retries = retries
+        self.outbox = outbox
+        self.commit_delay = commit_delay
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock())
+        self.chat_buckets = {}
+        self.pending = OrderedDict()
+        self.staged = []
+        self.deferred = {}
+        self.not_before = {}
+        self.attempts = {}
+        self.in_flight = set()
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.throttled = 0
+        self.failures = {}
+        self._condition = threading.Condition()
+        self._commit_lock = threading.Lock()
+        self._threads = []
+
+    def send_message(self, chat_id, text):
+        """Постановка сообщения в очередь чата."""
+        self.broadcast([chat_id], text)
+
+    def broadcast(self, chat_ids, text):
+        """Постановка одного сообщения в очереди нескольких чатов."""
+        with self._condition:
+            for chat_id in chat_ids:
+                if self.outbox is None:
+                    self.pending.setdefault(chat_id, deque()).append(text)
+                else:
+                    self.outbox.add(chat_id, text)
+                    self.staged.append((chat_id, text))
+            self._condition.notify_all()
+
+    def commit(self):
+        """Запись накопленных сообщений в журнал и постановка в очередь."""
+        if self.outbox is None:
+            return
+        with self._commit_lock:
+            with self._condition:
+                staged, self.staged = self.staged, []
+            if not staged:
+                return
+            self.outbox.commit()
+            with self._condition:
+                for chat_id, text in staged:
+                    self.pending.setdefault(chat_id, deque()).append(text)
+                self._condition.notify_all()
+
+    def deferred_depth(self):
+        """Число сообщений, отложенных после неудачных попыток."""
+        with self._condition:
+            return sum(len(parts) for _, parts in self.deferred.values())
+
+    def depth(self):
+        """Число сообщений, ожидающих отправки."""
+        with self._condition:
+            return len(self.staged) + sum(
+                len(texts) for texts in self.pending.values())
+
+    def _take(self, chat_id):
+        """Склейка сообщений чата в одно в пределах лимита Telegram."""
+        texts = self.pending[chat_id]
+        parts = [texts.popleft()]
+        size = len(parts[0])
+        while texts and size + len(SEPARATOR) + len(texts[0]) <= (
+                MESSAGE_LIMIT):
+            size += len(SEPARATOR) + len(texts[0])
+            parts.append(texts.popleft())
+        if not texts:
+            del self.pending[chat_id]
+        return parts
+
+    def _release(self, now):
+        """Возврат в очередь отложенных сообщений, чей срок настал."""
+        wait = None
+        for chat_id, (due, parts) in list(self.deferred.items()):
+            if due <= now:
+                del self.deferred[chat_id]
+                self._requeue(chat_id, parts)
+            else:
+                wait = due - now if wait is None else min(wait, due - now)
+        return wait
+
+    def _next(self, now):
+        """Следующий чат, которому можно отправить, или время ожидания."""
+        release_wait = self._release(now) if self.deferred else None
+        chat_id, wait = self._pick(now)
+        if chat_id is None and release_wait is not None:
+            wait = release_wait if wait is None else min(wait, release_wait)
+        return chat_id, wait
+
+    def _pick(self, now):
+        wait = self.global_bucket.delay(now)
+        if wait:
+            return None, wait
+        wait = None
+        for chat_id in self.pending:
+            if chat_id in self.in_flight:
+                continue
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self.chat_buckets[chat_id] = TokenBucket(
+                    self.chat_rate, 1, now)
+            chat_wait = max(bucket.delay(now),
+                            self.not_before.get(chat_id, 0) - now)
+            if chat_wait <= 0:
+                bucket.consume()
+                self.global_bucket.consume()
+                self.not_before.pop(chat_id, None)
+                return chat_id, 0.0
+            wait = chat_wait if wait is None else min(wait, chat_wait)
+        return None, wait
+
+    def _requeue(self, chat_id, parts):
+        self.pending.setdefault(chat_id, deque()).extendleft(reversed(parts))
+        self.pending.move_to_end(chat_id, last=False)
+
+    def _deliver(self, chat_id, parts):
+        from telegram.error import BadRequest, RetryAfter, Unauthorized
+
+        try:
+            with DELIVERY_LATENCY.time():
+                self.bot.send_message(chat_id, SEPARATOR.join(parts))
+        except RetryAfter as error:
+            DELIVERY_FAILURES.labels('retry_after').inc()
+            with self._condition:
+                self.throttled += 1
+                self.not_before[chat_id] = self.clock() + error.retry_after
+                self._requeue(chat_id, parts)
+            return
+        except Exception as error:
+            DELIVERY_FAILURES.labels(type(error).__name__).inc()
+            with self._condition:
+                attempt = self.attempts.get(chat_id, 0) + 1
+                if attempt < self.retries:
+                    self.attempts[chat_id] = attempt
+                    self._requeue(chat_id, parts)
+                    return
+                self.attempts.pop(chat_id, None)
+                self.failed += len(parts)
+                self.failures[chat_id] = error
+                permanent = isinstance(error, (BadRequest, Unauthorized))
+                if self.outbox is not None and not permanent:
+                    _, deferred = self.deferred.get(chat_id, (None, []))
+                    self.deferred[chat_id] = (
+                        self.clock() + self.retry_delay, deferred + parts)
+            logging.error(
+                'Бот не смог отправить сообщение в чат %s: %s', chat_id, error)
+            if self.outbox is not None and permanent:
+                self.outbox.ack(chat_id, parts)
+            return
+        if self.outbox is not None:
+            self.outbox.ack(chat_id, parts)
+        with self._condition:
+            self.attempts.pop(chat_id, None)
+            self.failures.pop(chat_id, None)
+            self.sent += 1
+            self.coalesced += len(parts) - 1
+        logging.info('Бот отправил сообщение: %s', SEPARATOR.join(parts))
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self.closed and not self.pending:
+                        return
+                    chat_id, wait = self._next(self.clock())
+                    if chat_id is not None:
+                        break
+                    self._condition.wait(wait)
+                parts = self._take(chat_id)
+                self.in_flight.add(chat_id)
+            try:
+                self._deliver(chat_id, parts)
+            finally:
+                with self._condition:
+                    self.in_flight.discard(chat_id)
+                    if chat_id in self.pending:
+                        self.pending.move_to_end(chat_id)
+                    self._condition.notify_all()
+
+    def _commit_periodically(self):
+        while True:
+            with self._condition:
+                while not self.staged and not self.closed:
+                    self._condition.wait()
+                if self.closed:
+                    return
+                deadline = self.clock() + self.commit_delay
+                while not self.closed and self.clock() < deadline:
+                    self._condition.wait(deadline - self.clock())
+            self.commit()
+
+    def start(self):
+        """Запуск потоков отправки и повтор неотправленного из журнала."""
+        targets = [self._work] * self.workers
+        if self.outbox is not None:
+            with self._condition:
+                for chat_id, text in self.outbox.unsent():
+                    self.pending.setdefault(chat_id, deque()).append(text)
+            targets.append(self._commit_periodically)
+        for number, target in enumerate(targets):
+            thread = threading.Thread(
+                target=target, name=f'outbound-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def flush(self, timeout=None):
+        """Ожидание отправки всех сообщений из очереди."""
+        self.commit()
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            while self.pending or self.in_flight:
+                left = None if deadline is None else deadline - self.clock()
+                if left is not None and left <= 0:
+                    return False
+                self._condition.wait(left)
+        return True
+
+    def close(self):
+        """Отправка оставшихся сообщений и остановка потоков."""
+        self.commit()
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        if self.outbox is not None:
+            self.outbox.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import HEDGE_REQUESTS
+
+HEDGE_REQUESTS_ENABLED = bool(os.getenv('HEDGE_REQUESTS'))
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 0.95))
+HEDGE_DELAY = float(os.getenv('HEDGE_DELAY', 1))
+HEDGE_MAX_RATIO = float(os.getenv('HEDGE_MAX_RATIO', 0.1))
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+class LatencyWindow:
+    """Длительности последних запросов для расчёта перцентиля."""
+
+    def __init__(self, size=HEDGE_WINDOW):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, value):
+        with self._lock:
+            self.samples.append(value)
+
+    def percentile(self, fraction):
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class HedgedTransport:
+    """Дублирующий запрос, если первый отвечает дольше обычного.
+
+    Повторяет интерфейс ``requests.get``. Если ответ не пришёл за
+    ``percentile`` недавних длительностей (до набора статистики —
+    за ``initial_delay``), отправляется копия запроса, и используется
+    тот ответ, что пришёл первым. Копий не больше ``max_ratio`` от
+    числа запросов; проигравший ответ закрывается.
+    """
+
+    def __init__(self, transport, percentile=HEDGE_PERCENTILE,
+                 initial_delay=HEDGE_DELAY, max_ratio=HEDGE_MAX_RATIO,
+                 window=None):
+        self.transport = transport
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.max_ratio = max_ratio
+        self.window = window or LatencyWindow()
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(thread_name_prefix='hedge')
+
+    def delay(self):
+        """Сколько ждать первый ответ перед отправкой копии."""
+        if len(self.window) < HEDGE_MIN_SAMPLES:
+            return self.initial_delay
+        return self.window.percentile(self.percentile)
+
+    def _may_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_ratio * self.requests:
+                return False
+            self.hedges += 1
+        HEDGE_REQUESTS.labels('fired').inc()
+        return True
+
+    def _submit(self, url, kwargs):
+        started = time.perf_counter()
+        future = self.executor.submit(self.transport.get, url, **kwargs)
+        future.add_done_callback(
+            lambda _: self.window.add(time.perf_counter() - started))
+        return future
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.requests += 1
+        primary = self._submit(url, kwargs)
+        done, _ = wait([primary], timeout=self.delay())
+        if done or not self._may_hedge():
+            return primary.result()
+        hedge = self._submit(url, kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next(
+                (future for future in done if future.exception() is None),
+                None)
+            if winner is not None:
+                break
+        else:
+            return primary.result()
+        if winner is hedge:
+            with self._lock:
+                self.wins += 1
+            HEDGE_REQUESTS.labels('won').inc()
+        loser = primary if winner is hedge else hedge
+        loser.add_done_callback(close_response)
+        return winner.result()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def close_response(future):
+    """Закрытие ответа, который пришёл вторым."""
+    if future.exception() is None:
+        future.result().close()
@@ -1,13 +1,31 @@
 import os
 import logging
-import requests
 import time
-from typing import Dict
-
-from telegram import Bot
+from http import HTTPStatus
+from typing import Iterator
 
 from dotenv import load_dotenv
 
+from alerts import ErrorAggregator
+from breaker import CircuitBreaker
+from delivery import OutboundQueue, pooled_bot
+from hedging import HEDGE_REQUESTS_ENABLED, HedgedTransport
+from liveness import (HEALTH_PORT, POLL_DEADLINE, WATCHDOG_GRACE, Watchdog,
+                      start_health_server)
+from log import setup_logging
+from metrics import (API_RESPONSES, CURSOR, DELIVERY_FAILURES,
+                     DELIVERY_LATENCY, METRICS_PORT, POLL_LATENCY,
+                     POLLS_AVOIDED, QUEUE_DEPTH, start_metrics_server)
+from outbox import Outbox
+from records import Homework
+from replay import RECORD_TRAFFIC, Recorder
+from scheduler import create_scheduler
+from state import StateStore, homework_key
+from streaming import HomeworkStream
+from subscriptions import Subscriptions
+from tracing import Profiler, span, traced
+from webhook import WEBHOOK_PORT, WEBHOOK_RECONCILE_TIME, WebhookReceiver
+
 load_dotenv()
 
 
@@ -19,56 +37,145 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 RETRY_TIME = 5
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+STREAM_RESPONSES = bool(os.getenv('STREAM_RESPONSES'))
+CURSOR_OVERLAP = int(os.getenv('CURSOR_OVERLAP', 300))
+WATERMARK_RETENTION = int(os.getenv('WATERMARK_RETENTION', 24 * 60 * 60))
+UNDATED_STATUS_LIMIT = int(os.getenv('UNDATED_STATUS_LIMIT', 1000))
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
 
+api_client = None
+subscriptions = None
 
 OLD_STATUSES = {}
+SCOPED_STATUSES = {}
 HOMEWORK_STATUSES = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+STATUS_TEMPLATES = {
+    status: (
+        'Изменился статус проверки работы "{}". '
+        + verdict.replace('{', '{{').replace('}', '}}')
+    ).format
+    for status, verdict in HOMEWORK_STATUSES.items()
+}
+
+
+class APIError(Exception):
+    """Эндпоинт ответил кодом, отличным от 200."""
+
+    def __init__(self, message, status_code):
+        """Сообщение и код ответа API."""
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_server_failure(error):
+    """Ошибки 4xx — проблема запроса, а не эндпоинта."""
+    return not (isinstance(error, APIError) and error.status_code < 500)
 
-logging.basicConfig(
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO)
+
+PRACTICUM_BREAKER = CircuitBreaker('practicum', is_failure=is_server_failure)
 
 
 def send_message(bot, message):
     """Отправка сообщений."""
+    return send_message_to(bot, TELEGRAM_CHAT_ID, message)
+
+
+def subscribers(homework):
+    """Чаты, подписанные на вердикты по работе."""
+    if subscriptions is None:
+        return [TELEGRAM_CHAT_ID]
+    return subscriptions.chats_for(homework)
+
+
+@traced()
+def send_message_to(bot, chat_id, message):
+    """Отправка сообщения в указанный чат.
+
+    ``OutboundQueue`` только принимает сообщение: доставку она замеряет
+    и записывает в лог сама. Возвращает ``False``, если отправить или
+    поставить сообщение в очередь не удалось.
+    """
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logging.info(f'Бот отправил сообщение: {message}')
-    except Exception:
+        if isinstance(bot, OutboundQueue):
+            bot.send_message(chat_id, message)
+            return True
+        with DELIVERY_LATENCY.time():
+            bot.send_message(chat_id, message)
+        logging.info('Бот отправил сообщение: %s', message)
+        return True
+    except Exception as error:
+        DELIVERY_FAILURES.labels(type(error).__name__).inc()
         logging.error('Бот не смог отправить сообщение')
+        return False
 
 
+@traced()
 def get_api_answer(current_timestamp):
     """Получение API."""
+    return fetch_statuses(current_timestamp, HEADERS)
+
+
+def fetch_statuses(current_timestamp, headers, transport=None):
+    """Запрос статусов с заданными заголовками авторизации."""
+    import requests
+
+    from practicum import DEFAULT_TIMEOUT
+
     timestamp = current_timestamp or int(time.time())
     params = {'from_date': timestamp}
-    status = requests.get(ENDPOINT, headers=HEADERS, params=params)
-    if status.status_code != requests.codes.ok:
-        # return status.json()
-        logging.error(f'Эндпоинт {ENDPOINT} недоступен. '
-                      f'Код ответа API: {status.status_code}')
-        raise Exception(f'Эндпоинт {ENDPOINT} недоступен. '
-                        f'Код ответа API: {status.status_code}')
-    return status.json()
+    transport = transport or api_client or requests
+    kwargs = {'stream': True} if STREAM_RESPONSES else {}
+    if transport is requests:
+        kwargs['timeout'] = DEFAULT_TIMEOUT
+    with PRACTICUM_BREAKER:
+        with POLL_LATENCY.time(), span('network'):
+            status = transport.get(ENDPOINT, headers=headers, params=params,
+                                   **kwargs)
+        API_RESPONSES.labels(status.status_code).inc()
+        if status.status_code != HTTPStatus.OK:
+            # return status.json()
+            logging.error('Эндпоинт %s недоступен. Код ответа API: %s',
+                          ENDPOINT, status.status_code)
+            raise APIError(f'Эндпоинт {ENDPOINT} недоступен. '
+                           f'Код ответа API: {status.status_code}',
+                           status.status_code)
+    if STREAM_RESPONSES:
+        return HomeworkStream.from_response(status)
+    with span('json_decode'):
+        return status.json()
 
 
+@traced()
 def check_response(response):
     """Проверка ключей."""
     homeworks = response['homeworks']
     if homeworks is not None:
-        if isinstance(homeworks, list):
+        if isinstance(homeworks, (list, Iterator)):
             return homeworks
         logging.error('отсутствие ожидаемых ключей в ответе API')
         raise Exception('отсутствие ожидаемых ключей в ответе API')
 
 
+@traced()
 def parse_status(homework):
     """Проверка статуса."""
-    if not isinstance(homework, Dict):
+    if not isinstance(homework, Homework):
+        homework = Homework.from_dict(homework)
+    verdict = HOMEWORK_STATUSES[homework.status]
+    logging.info('Новый статус работы. %s', verdict)
+    return (f'Изменился статус проверки работы "{homework.name}". {verdict}')
+
+
+def render_status(homework, templates=STATUS_TEMPLATES):
+    """Сообщение о статусе работы с теми же ошибками, что у parse_status."""
+    if isinstance(homework, Homework):
+        return templates[homework.status](homework.name)
+    if not isinstance(homework, dict):
         raise TypeError('Это не словарь!')
     homework_name = homework.get('homework_name')
     if homework_name is None:
@@ -76,11 +183,110 @@ def parse_status(homework):
     homework_status = homework.get('status')
     if homework_status is None:
         raise KeyError('Статус не существует')
-    verdict = HOMEWORK_STATUSES[homework_status]
-    if verdict is None:
-        raise KeyError(f'Ошибка статуса {verdict}')
-    logging.info(f'Новый статус работы. {verdict}')
-    return (f'Изменился статус проверки работы "{homework_name}". {verdict}')
+    return templates[homework_status](homework_name)
+
+
+@traced()
+def parse_statuses(homeworks):
+    """Проверка статусов пачкой с теми же ошибками, что у parse_status."""
+    messages = [render_status(homework) for homework in homeworks]
+    logging.info('Новые статусы работ: %s', len(messages))
+    return messages
+
+
+def render_statuses(homeworks):
+    """Пары ``(работа, сообщение)`` по мере чтения ответа.
+
+    Сообщение готовится сразу после чтения работы, поэтому отправка
+    начинается, пока тело ответа ещё приходит.
+    """
+    for homework in homeworks:
+        with span('parse_status'):
+            message = render_status(homework)
+        yield homework, message
+
+
+def to_records(homeworks):
+    """Записи Homework вместо словарей; дальше по конвейеру идут они."""
+    return (Homework.from_dict(homework) for homework in homeworks)
+
+
+def statuses_for(scope=None):
+    """Отметки статусов: общие или арендатора ``scope``.
+
+    У каждого арендатора свой словарь, чтобы его отметки загружались
+    и забывались по его собственному курсору.
+    """
+    if scope is None:
+        return OLD_STATUSES
+    return SCOPED_STATUSES.setdefault(scope, {})
+
+
+def is_transition(homework, scope=None):
+    """Проверка, что статус работы действительно изменился."""
+    if not isinstance(homework, (dict, Homework)):
+        return True
+    old = statuses_for(scope).get(homework_key(homework, scope))
+    if old is None:
+        return True
+    old_status, old_date = old
+    date_updated = homework.get('date_updated')
+    if date_updated and old_date and date_updated != old_date:
+        return date_updated > old_date
+    return homework.get('status') != old_status
+
+
+def diff_statuses(homeworks, scope=None):
+    """Только работы с новым статусом относительно OLD_STATUSES."""
+    return (homework for homework in homeworks
+            if is_transition(homework, scope))
+
+
+def remember_status(homework, store=None, scope=None):
+    """Запоминание последнего статуса работы в памяти и на диске."""
+    key = homework_key(homework, scope)
+    statuses = statuses_for(scope)
+    statuses.pop(key, None)
+    statuses[key] = (homework.get('status'), homework.get('date_updated'))
+    if store is not None:
+        store.set_status(homework, scope)
+
+
+def window_start(cursor):
+    """``from_date`` с перекрытием: обновления на стыке окон не теряются."""
+    return max(1, cursor - CURSOR_OVERLAP)
+
+
+def forget_statuses(before, store=None, scope=None):
+    """Забывает отметки работ, обновлённых раньше ``before``.
+
+    Такие работы уже не попадают в окно опроса. OLD_STATUSES упорядочен
+    по времени запоминания, поэтому просматривается только его начало.
+    Отметки без даты не мешают просмотру, но из начала словаря их
+    остаётся не больше ``UNDATED_STATUS_LIMIT``: лишние забываются.
+    """
+    statuses = statuses_for(scope)
+    threshold = time.strftime(DATE_FORMAT, time.gmtime(before))
+    expired = []
+    undated = []
+    for key, (_, date_updated) in statuses.items():
+        if date_updated is None:
+            undated.append(key)
+        elif date_updated < threshold:
+            expired.append(key)
+        else:
+            break
+    expired += undated[:max(0, len(undated) - UNDATED_STATUS_LIMIT)]
+    for key in expired:
+        del statuses[key]
+        if store is not None:
+            store.forget_status(key)
+
+
+def prune_statuses(cursor, store=None, scope=None):
+    """Забывает отметки работ, давно вышедших из окна опроса."""
+    forget_statuses(
+        cursor - CURSOR_OVERLAP - WATERMARK_RETENTION, store, scope)
 
 
 def check_tokens():
@@ -95,31 +301,151 @@ def check_tokens():
     if no_token is None:
         return True
     logging.critical(
-        f'Отсутствует обязательная переменная окружения: {no_token}')
+        'Отсутствует обязательная переменная окружения: %s', no_token)
     return False
 
 
+def notify(bot, homeworks, store=None):
+    """Отправка сообщений об изменившихся статусах.
+
+    Статусы попадают в ``store`` только после того, как сообщения о них
+    записаны в журнал отправки.
+    """
+    changes = []
+    try:
+        for homework, message in render_statuses(
+                diff_statuses(to_records(homeworks))):
+            for chat_id in subscribers(homework):
+                send_message_to(bot, chat_id, message)
+            remember_status(homework)
+            changes.append(homework)
+    finally:
+        if changes:
+            logging.info('Новые статусы работ: %s', len(changes))
+        if store is not None and changes:
+            commit_messages(bot)
+            for homework in changes:
+                store.set_status(homework)
+    return changes
+
+
+def commit_messages(bot):
+    """Запись сообщений в журнал отправки до сохранения статусов."""
+    if hasattr(bot, 'commit'):
+        bot.commit()
+
+
+def poll_cycle(bot, store, scheduler, alerts, current_timestamp):
+    """Один цикл опроса API; возвращает новый курсор."""
+    try:
+        response = get_api_answer(window_start(current_timestamp))
+        try:
+            changes = notify(bot, check_response(response), store)
+        finally:
+            current_timestamp = max(
+                current_timestamp, response['current_date'])
+        store.set_cursor(current_timestamp)
+        prune_statuses(current_timestamp, store)
+        CURSOR.set(current_timestamp)
+        scheduler.record(changes)
+        message = alerts.resolve()
+    except Exception as error:
+        scheduler.record_error(error)
+        logging.error('Сбой в работе программы: %s', error)
+        message = alerts.report(error)
+    finally:
+        commit_messages(bot)
+        store.flush()
+    if message is not None:
+        send_message(bot, message)
+    return current_timestamp
+
+
+def push_cycle(bot, store, scheduler, alerts, homeworks):
+    """Обработка работ, присланных через webhook."""
+    try:
+        scheduler.observe(notify(bot, homeworks, store))
+    except Exception as error:
+        logging.error('Сбой обработки webhook: %s', error)
+        message = alerts.report(error)
+        if message is not None:
+            send_message(bot, message)
+    finally:
+        commit_messages(bot)
+        store.flush()
+
+
+def idle(bot, store, scheduler, alerts, receiver, delay):
+    """Пауза до следующего опроса; в режиме push — обработка входящих."""
+    if receiver is None:
+        time.sleep(delay)
+        return
+    deadline = time.monotonic() + delay
+    remaining = delay
+    while remaining > 0:
+        for homeworks in receiver.wait(remaining):
+            push_cycle(bot, store, scheduler, alerts, homeworks)
+        remaining = deadline - time.monotonic()
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
         logging.error('Программа принудительно остановлена.')
         raise Exception('Программа принудительно остановлена.')
-    bot = Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = 1
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            current_timestamp = response['current_date']
-            homeworks = check_response(response)
-            for homework in homeworks:
-                homework_status = parse_status(homework)
-                send_message(bot, homework_status)
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            send_message(bot, message)
-        finally:
-            time.sleep(RETRY_TIME)
+    from practicum import PracticumClient
+
+    global api_client, subscriptions
+    api_client = PracticumClient()
+    subscriptions = Subscriptions.load(chats=[TELEGRAM_CHAT_ID])
+    if HEDGE_REQUESTS_ENABLED:
+        api_client = HedgedTransport(api_client)
+    if RECORD_TRAFFIC:
+        api_client = Recorder(api_client)
+    bot = OutboundQueue(
+        pooled_bot(TELEGRAM_TOKEN), outbox=Outbox()).start()
+    QUEUE_DEPTH.labels('outbound').set_function(bot.depth)
+    QUEUE_DEPTH.labels('deferred').set_function(bot.deferred_depth)
+    if METRICS_PORT:
+        start_metrics_server()
+    receiver = None
+    if WEBHOOK_PORT:
+        receiver = WebhookReceiver(check_response).start()
+    scheduler = create_scheduler(
+        WEBHOOK_RECONCILE_TIME if receiver else RETRY_TIME)
+    alerts = ErrorAggregator()
+    store = StateStore()
+    OLD_STATUSES.update(store.load_statuses())
+    scheduler.seed(OLD_STATUSES)
+    POLLS_AVOIDED.set_function(lambda: scheduler.polls_avoided)
+    current_timestamp = store.get_cursor()
+    profiler = Profiler()
+    watchdog = Watchdog().start()
+    if HEALTH_PORT:
+        start_health_server(watchdog)
+    try:
+        while True:
+            with span('cycle'):
+                with profiler, watchdog.stage('poll', POLL_DEADLINE):
+                    current_timestamp = poll_cycle(
+                        bot, store, scheduler, alerts, current_timestamp)
+                delay = scheduler.next_delay()
+                with span('sleep'), watchdog.stage(
+                        'sleep', delay + WATCHDOG_GRACE):
+                    idle(bot, store, scheduler, alerts, receiver, delay)
+            watchdog.beat()
+            logging.debug('Планировщик: %s', scheduler.metrics())
+    finally:
+        watchdog.close()
+        if receiver is not None:
+            receiver.close()
+        bot.close()
+        store.close()
 
 
 if __name__ == '__main__':
-    main()
+    listener = setup_logging()
+    try:
+        main()
+    finally:
+        listener.stop()
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from metrics import (LOOP_LAG, METRICS_HOST, WATCHDOG_STALLS, route_handler,
+                     serve_in_background)
+
+HEALTH_PORT = os.getenv('HEALTH_PORT')
+WATCHDOG_INTERVAL = float(os.getenv('WATCHDOG_INTERVAL', 5))
+WATCHDOG_GRACE = float(os.getenv('WATCHDOG_GRACE', 30))
+POLL_DEADLINE = float(os.getenv('POLL_DEADLINE', 120))
+WATCHDOG_ABORT_AFTER = float(os.getenv('WATCHDOG_ABORT_AFTER', 0))
+ABORT_EXIT_CODE = 70
+
+
+def format_stacks():
+    """Стеки всех потоков процесса."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    blocks = []
+    for ident, frame in sys._current_frames().items():
+        blocks.append(f'Поток {names.get(ident, ident)}:\n'
+                      + ''.join(traceback.format_stack(frame)))
+    return '\n'.join(blocks)
+
+
+class Watchdog:
+    """Сторож главного цикла.
+
+    Цикл отмечает вход в каждую стадию со сроком её завершения
+    (``stage()``) и конец итерации (``beat()``). Фоновый поток раз в
+    ``interval`` секунд сравнивает срок с часами: если стадия
+    просрочена, в лог один раз пишутся стеки всех потоков, а если задан
+    ``abort_after``, то после стольких секунд просрочки процесс
+    завершается, чтобы его перезапустила платформа. Отметка стадии —
+    одно присваивание, без блокировок.
+    """
+
+    def __init__(self, interval=WATCHDOG_INTERVAL,
+                 abort_after=WATCHDOG_ABORT_AFTER, clock=time.monotonic,
+                 abort=None):
+        self.interval = interval
+        self.abort_after = abort_after
+        self.clock = clock
+        self.abort = abort or (lambda: os._exit(ABORT_EXIT_CODE))
+        self.current = None
+        self.last_beat = clock()
+        self.cycles = 0
+        self.stalls = 0
+        self._reported = None
+        self._stop = threading.Event()
+        self._thread = None
+        LOOP_LAG.set_function(self.lag)
+
+    def enter(self, name, timeout):
+        """Начало стадии ``name`` со сроком ``timeout`` секунд."""
+        self.current = (name, self.clock() + timeout)
+
+    def leave(self):
+        self.current = None
+
+    def stage(self, name, timeout):
+        """Контекстный менеджер вокруг ``enter()`` и ``leave()``."""
+        return Stage(self, name, timeout)
+
+    def beat(self):
+        """Отметка о завершённой итерации цикла."""
+        self.last_beat = self.clock()
+        self.cycles += 1
+
+    def lag(self):
+        """На сколько секунд текущая стадия вышла за свой срок."""
+        current = self.current
+        if current is None:
+            return 0.0
+        return max(0.0, self.clock() - current[1])
+
+    def health(self):
+        """Состояние цикла для ``/health``."""
+        current = self.current
+        lag = self.lag()
+        return {
+            'status': 'stalled' if lag else 'ok',
+            'stage': current and current[0],
+            'lag': round(lag, 3),
+            'since_last_cycle': round(self.clock() - self.last_beat, 3),
+            'cycles': self.cycles,
+            'stalls': self.stalls,
+        }
+
+    def check(self):
+        """Проверка срока стадии; ``False`` — цикл завис."""
+        current = self.current
+        lag = self.lag()
+        if not lag:
+            return True
+        if self._reported is not current:
+            self._reported = current
+            self.stalls += 1
+            WATCHDOG_STALLS.labels(current[0]).inc()
+            logging.critical(
+                'Стадия %s просрочена на %.1f с, стеки потоков:\n%s',
+                current[0], lag, format_stacks())
+        if self.abort_after and lag >= self.abort_after:
+            logging.critical('Цикл завис на %.1f с, процесс завершается', lag)
+            self.abort()
+        return False
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Запуск потока проверки."""
+        self._thread = threading.Thread(
+            target=self._watch, name='watchdog', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Stage:
+    """Стадия цикла под присмотром ``Watchdog``."""
+
+    __slots__ = ('watchdog', 'name', 'timeout')
+
+    def __init__(self, watchdog, name, timeout):
+        self.watchdog = watchdog
+        self.name = name
+        self.timeout = timeout
+
+    def __enter__(self):
+        self.watchdog.enter(self.name, self.timeout)
+
+    def __exit__(self, *exc_info):
+        self.watchdog.leave()
+
+
+def health_response(watchdog):
+    """Ответ ``/health``: 200, пока цикл укладывается в сроки, иначе 503."""
+    health = watchdog.health()
+    return (200 if health['status'] == 'ok' else 503, 'application/json',
+            json.dumps(health).encode())
+
+
+def health_handler(watchdog):
+    """Класс обработчика ``/health``."""
+    return route_handler({'/health': lambda: health_response(watchdog)})
+
+
+def start_health_server(watchdog, port=HEALTH_PORT, host=METRICS_HOST):
+    """HTTP-сервер ``/health`` в фоновом потоке."""
+    return serve_in_background(health_handler(watchdog), port, host, 'health')
@@ -1,18 +1,121 @@
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename='main.log',
-    filemode='w'
-)
-
-
-logging.debug('Статус не изменен')
-logging.info('Бот отправил сообщение')
-logging.warning('Большая нагрузка!')
-logging.error('Сбой в работе программы: Эндпоинт https://practicum.yandex.ru/api/user_api/homework_statuses/111 недоступен. Код ответа API: 404')
-logging.error('Бот не смог отправить сообщение')
-logging.error('сбои при запросе к эендпоинту')
-logging.error('отсутствие ожидаемых ключей в ответе API ')
-logging.error('недокументированный статус домашней работы, обнаруженный в ответе API')
-logging.critical('Отсутствует обязательная переменная окружения: { }') 
\ No newline at end of file
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FILE = os.getenv('LOG_FILE')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_JSON = bool(os.getenv('LOG_JSON'))
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', 1))
+LOG_SAMPLE_TEMPLATES = int(os.getenv('LOG_SAMPLE_TEMPLATES', 1024))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает одну из ``every`` записей с одинаковым шаблоном.
+
+    Выборка касается только INFO и ниже: предупреждения и ошибки
+    пишутся всегда. Шаблон — это строка до подстановки аргументов,
+    поэтому частые сообщения о статусах прореживаются, а редкие — нет.
+    Счётчики хранятся для ``templates`` последних шаблонов: давно не
+    встречавшиеся вытесняются и начинают счёт заново.
+    """
+
+    def __init__(self, every=LOG_SAMPLE_EVERY, templates=LOG_SAMPLE_TEMPLATES):
+        super().__init__()
+        self.every = every
+        self.templates = templates
+        self.counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.every <= 1 or record.levelno > logging.INFO:
+            return True
+        with self._lock:
+            count = self.counts.pop(record.msg, 0)
+            self.counts[record.msg] = (count + 1) % self.every
+            if len(self.counts) > self.templates:
+                self.counts.popitem(last=False)
+        return count == 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Кладёт записи в очередь и никогда не ждёт.
+
+    Форматирование откладывается до фонового потока; если очередь
+    переполнена, запись отбрасывается и учитывается в ``dropped``.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BlockingStopListener(QueueListener):
+    """Слушатель, который при остановке ждёт места в полной очереди."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def build_handler(path=LOG_FILE, json_format=LOG_JSON,
+                  max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """Обработчик для фонового потока: файл с ротацией или stderr."""
+    if path:
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8')
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(
+        JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def setup_logging(level=LOG_LEVEL, handler=None,
+                  sample_every=LOG_SAMPLE_EVERY, queue_size=LOG_QUEUE_SIZE):
+    """Настраивает корневой логгер на запись через очередь.
+
+    Возвращает запущенный ``QueueListener``; его ``stop()`` дописывает
+    оставшиеся записи и должен вызываться при завершении программы.
+    """
+    log_queue = queue.Queue(queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_every))
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    listener = BlockingStopListener(log_queue, handler or build_handler())
+    listener.start()
+    return listener
@@ -0,0 +1,300 @@
+import bisect
+import os
+import threading
+import time
+
+METRICS_PORT = os.getenv('METRICS_PORT')
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Общая часть метрик: имя, описание и дочерние метрики по меткам."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values):
+        """Метрика для конкретных значений меток."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f'У метрики {self.name} есть метки')
+        return self.labels()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} {self.kind}']
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, key):
+        return [f'{name}{format_labels(labelnames, key)} '
+                f'{format_value(self.value)}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+    _new_child = CounterChild
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+
+class GaugeChild:
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function):
+        """Значение вычисляется только при чтении метрик."""
+        self.function = function
+
+    def get(self):
+        return self.value if self.function is None else self.function()
+
+    def render(self, name, labelnames, key):
+        return [f'{name}{format_labels(labelnames, key)} '
+                f'{format_value(self.get())}']
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+    _new_child = GaugeChild
+
+    def set(self, value):
+        self._default().set(value)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+    def get(self):
+        return self._default().get()
+
+
+class HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return Timer(self)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def render(self, name, labelnames, key):
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            le = '+Inf' if bound == float('inf') else format_value(bound)
+            labels = format_labels(labelnames, key, [('le', le)])
+            lines.append(f'{name}_bucket{labels} {total}')
+        labels = format_labels(labelnames, key)
+        lines.append(f'{name}_sum{labels} {format_value(self.sum)}')
+        lines.append(f'{name}_count{labels} {total}')
+        return lines
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        """Контекстный менеджер, замеряющий длительность блока."""
+        return self._default().time()
+
+
+class Timer:
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class Registry:
+    """Набор метрик, который отдаётся в текстовом формате Prometheus."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f'Метрика {metric.name} уже зарегистрирована')
+        self.metrics[metric.name] = metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+POLL_LATENCY = Histogram(
+    'homework_poll_seconds', 'Длительность запроса к API Практикума.')
+API_RESPONSES = Counter(
+    'homework_api_responses_total', 'Ответы API Практикума по коду.',
+    ['code'])
+DELIVERY_LATENCY = Histogram(
+    'homework_delivery_seconds', 'Отправка сообщения в Telegram.')
+DELIVERY_FAILURES = Counter(
+    'homework_delivery_failures_total',
+    'Ошибки отправки в Telegram по типу.', ['reason'])
+QUEUE_DEPTH = Gauge(
+    'homework_queue_depth', 'Сообщений в очереди.', ['queue'])
+WEBHOOK_REQUESTS = Counter(
+    'homework_webhook_requests_total', 'Запросы к webhook по коду ответа.',
+    ['code'])
+BREAKER_STATE = Gauge(
+    'homework_breaker_state',
+    'Состояние цепи: 0 — замкнута, 1 — пробная, 2 — разомкнута.', ['name'])
+BREAKER_TRANSITIONS = Counter(
+    'homework_breaker_transitions_total', 'Переходы цепи по состояниям.',
+    ['name', 'state'])
+BREAKER_REJECTED = Counter(
+    'homework_breaker_rejected_total',
+    'Вызовы, отклонённые разомкнутой цепью.', ['name'])
+HEDGE_REQUESTS = Counter(
+    'homework_hedge_requests_total',
+    'Дублирующие запросы к API: fired — отправлены, won — ответили первыми.',
+    ['outcome'])
+LOOP_LAG = Gauge(
+    'homework_loop_lag_seconds',
+    'На сколько текущая стадия главного цикла вышла за свой срок.')
+WATCHDOG_STALLS = Counter(
+    'homework_watchdog_stalls_total', 'Зависания главного цикла по стадиям.',
+    ['stage'])
+POLLS_AVOIDED = Gauge(
+    'homework_polls_avoided',
+    'Опросы, пропущенные планировщиком относительно базового интервала.')
+CURSOR = Gauge(
+    'homework_cursor_timestamp', 'Текущее значение from_date.')
+CURSOR_LAG = Gauge(
+    'homework_cursor_lag_seconds', 'Отставание from_date от текущего времени.')
+CURSOR_LAG.set_function(
+    lambda: time.time() - CURSOR.get() if CURSOR.get() else 0)
+
+
+def route_handler(routes):
+    """Класс обработчика GET-запросов; ``http.server`` грузится здесь.
+
+    ``routes`` — ``{путь: функция}``, функция возвращает код ответа,
+    ``Content-Type`` и тело в байтах.
+    """
+    from http.server import BaseHTTPRequestHandler
+
+    class RouteHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            route = routes.get(self.path.split('?')[0])
+            if route is None:
+                self.send_error(404)
+                return
+            code, content_type, body = route()
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return RouteHandler
+
+
+def serve_in_background(handler, port, host, name):
+    """HTTP-сервер с обработчиком ``handler`` в фоновом потоке."""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=name,
+                     daemon=True).start()
+    return server
+
+
+def metrics_handler(registry):
+    """Класс обработчика ``/metrics``."""
+    return route_handler({'/metrics': lambda: (
+        200, 'text/plain; version=0.0.4', registry.render().encode())})
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST,
+                         registry=REGISTRY):
+    """HTTP-сервер ``/metrics`` в фоновом потоке."""
+    return serve_in_background(
+        metrics_handler(registry), port, host, 'metrics')
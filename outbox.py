@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+
+OUTBOX_PATH = os.getenv('OUTBOX_PATH', 'outbox.jsonl')
+OUTBOX_COMMIT_DELAY = float(os.getenv('OUTBOX_COMMIT_DELAY', 0.01))
+OUTBOX_COMPACT_EVERY = int(os.getenv('OUTBOX_COMPACT_EVERY', 1000))
+
+
+class Outbox:
+    """Журнал исходящих сообщений на диске (write-ahead).
+
+    ``add()`` копит сообщения в памяти, ``commit()`` дописывает их в файл
+    и делает один ``fsync`` на всю пачку. После отправки ``ack()``
+    отмечает сообщения доставленными; когда отметок накапливается
+    ``compact_every``, файл переписывается с одними неотправленными.
+    Неотправленные сообщения прошлого запуска возвращает ``unsent()``.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, compact_every=OUTBOX_COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self.pending = {}
+        self.next_id = 1
+        self.commits = 0
+        self.garbage = 0
+        self._ids = defaultdict(deque)
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._load()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logging.warning('Пропущена повреждённая запись журнала %s',
+                                self.path)
+                continue
+            if 'ack' in record:
+                self._forget(record['ack'])
+            else:
+                self._remember(
+                    record['id'], record['chat_id'], record['text'])
+            self.next_id = max(self.next_id, record.get('id', 0) + 1)
+        self.garbage = len(lines) - len(self.pending)
+
+    def _remember(self, message_id, chat_id, text):
+        self.pending[message_id] = (chat_id, text)
+        self._ids[chat_id, text].append(message_id)
+
+    def _forget(self, message_id):
+        message = self.pending.pop(message_id, None)
+        if message is not None:
+            ids = self._ids[message]
+            ids.remove(message_id)
+            if not ids:
+                del self._ids[message]
+
+    def unsent(self):
+        """Сообщения, отправка которых не подтверждена."""
+        with self._lock:
+            return list(self.pending.values())
+
+    def add(self, chat_id, text):
+        """Сообщение в журнал; на диске оно окажется после ``commit()``."""
+        with self._lock:
+            message_id = self.next_id
+            self.next_id += 1
+            self._remember(message_id, chat_id, text)
+            self._buffer.append(json.dumps(
+                {'id': message_id, 'chat_id': chat_id, 'text': text},
+                ensure_ascii=False) + '\n')
+        return message_id
+
+    def commit(self):
+        """Запись накопленных сообщений одним ``fsync``."""
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            self.file.write(''.join(lines))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.commits += 1
+
+    def ack(self, chat_id, texts):
+        """Подтверждение отправки сообщений в чат.
+
+        Отметки пишутся без ``fsync``: если они потеряются, сообщение
+        после перезапуска уйдёт ещё раз, но не пропадёт.
+        """
+        with self._io_lock:
+            with self._lock:
+                ids = []
+                for text in texts:
+                    same = self._ids.get((chat_id, text))
+                    if same:
+                        ids.append(same[0])
+                        self._forget(same[0])
+                self.garbage += 2 * len(ids)
+                compact = (self.garbage >= self.compact_every
+                           and self.garbage > len(self.pending))
+            if not compact:
+                self.file.write(''.join(
+                    json.dumps({'ack': message_id}) + '\n'
+                    for message_id in ids))
+                self.file.flush()
+                return
+            self._compact()
+
+    def _compact(self):
+        with self._lock:
+            lines = [json.dumps(
+                {'id': message_id, 'chat_id': chat_id, 'text': text},
+                ensure_ascii=False) + '\n'
+                for message_id, (chat_id, text) in self.pending.items()]
+            self._buffer = []
+            self.garbage = 0
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(''.join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+        self.file.close()
+        os.replace(temporary, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        self.commit()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,42 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = int(os.getenv('API_POOL_SIZE', 4))
+CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', 10))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+class PracticumClient:
+    """Долгоживущий клиент API с пулом keep-alive соединений.
+
+    Повторяет интерфейс ``requests.get``, поэтому подставляется
+    в ``get_api_answer`` вместо модуля ``requests``.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, gzip=True):
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Accept-Encoding'] = (
+            'gzip' if gzip else 'identity')
+
+    def get(self, url, **kwargs):
+        """GET-запрос через общий пул соединений."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        """Закрытие всех соединений пула."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,68 @@
+from operator import attrgetter
+from sys import intern
+
+FIELDS = {
+    'id': 'id',
+    'homework_name': 'name',
+    'status': 'status',
+    'date_updated': 'date_updated',
+}
+
+
+class Homework:
+    """Неизменяемая запись о работе: только поля, которые нужны боту.
+
+    Создаётся один раз на входе конвейера вместо словаря из ответа API
+    и весит в несколько раз меньше. Строки статусов интернируются, так
+    что все записи ссылаются на одни и те же объекты. ``get()`` понимает
+    ключи API, поэтому запись подходит туда, где раньше был словарь.
+    """
+
+    __slots__ = ('_id', '_name', '_status', '_date_updated')
+
+    def __init__(self, id, name, status, date_updated=None):
+        self._id = id
+        self._name = name
+        self._status = intern(status) if type(status) is str else status
+        self._date_updated = date_updated
+
+    id = property(attrgetter('_id'))
+    name = property(attrgetter('_name'))
+    status = property(attrgetter('_status'))
+    date_updated = property(attrgetter('_date_updated'))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Запись из словаря API с теми же ошибками, что у parse_status."""
+        if not isinstance(data, dict):
+            raise TypeError('Это не словарь!')
+        name = data.get('homework_name')
+        if name is None:
+            raise KeyError('Имя не существует')
+        status = data.get('status')
+        if status is None:
+            raise KeyError('Статус не существует')
+        return cls(data.get('id'), name, status, data.get('date_updated'))
+
+    def get(self, key, default=None):
+        value = getattr(self, FIELDS[key]) if key in FIELDS else None
+        return default if value is None else value
+
+    def _astuple(self):
+        return (self._id, self._name, self._status, self._date_updated)
+
+    def __reduce__(self):
+        return Homework, self._astuple()
+
+    def __eq__(self, other):
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self):
+        return hash(self._astuple())
+
+    def __repr__(self):
+        return (f'Homework(id={self._id!r}, name={self._name!r}, '
+                f'status={self._status!r}, '
+                f'date_updated={self._date_updated!r})')
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from log import setup_logging
+
+RECORD_TRAFFIC = bool(os.getenv('RECORD_TRAFFIC'))
+CAPTURE_FILE = os.getenv('CAPTURE_FILE', 'captures.jsonl')
+REPLAY_SPEED = float(os.getenv('REPLAY_SPEED', 0))
+
+
+class CapturedResponse:
+    """Ответ API, восстановленный из записи.
+
+    Повторяет ту часть ``requests.Response``, которую читает бот, так что
+    записанный и воспроизведённый ответ обрабатываются одинаково.
+    """
+
+    def __init__(self, capture):
+        self.status_code = capture['status']
+        self.text = capture['body']
+        self.content = self.text.encode()
+        self.headers = {'Content-Type': 'application/json'}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        data = self.text if decode_unicode else self.content
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def replay_error(capture):
+    """Исключение, которым завершился записанный запрос."""
+    import requests
+
+    error_class = getattr(requests.exceptions, capture['error'], None)
+    if not (isinstance(error_class, type)
+            and issubclass(error_class, Exception)):
+        error_class = Exception
+    return error_class(capture['message'])
+
+
+class Recorder:
+    """Запись запросов к API и ответов на них в JSONL.
+
+    Повторяет интерфейс ``requests.get`` и оборачивает транспорт бота.
+    Каждая строка файла — один запрос: время начала, параметры, код и
+    тело ответа или исключение, длительность. Заголовки не пишутся,
+    чтобы токен не попал в запись.
+    """
+
+    def __init__(self, transport, path=CAPTURE_FILE):
+        self.transport = transport
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        capture = {'time': time.time(), 'url': url,
+                   'params': kwargs.get('params') or {}}
+        started = time.perf_counter()
+        try:
+            response = self.transport.get(url, **kwargs)
+            try:
+                capture['status'] = response.status_code
+                capture['body'] = response.text
+            finally:
+                response.close()
+        except Exception as error:
+            capture['error'] = type(error).__name__
+            capture['message'] = str(error)
+            raise
+        finally:
+            capture['elapsed'] = time.perf_counter() - started
+            self.write(capture)
+        return CapturedResponse(capture)
+
+    def write(self, capture):
+        line = json.dumps(capture, ensure_ascii=False) + '\n'
+        with self._lock:
+            self.file.write(line)
+            self.file.flush()
+            self.recorded += 1
+
+    def close(self):
+        self.file.close()
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_captures(path=CAPTURE_FILE):
+    """Записи из JSONL-файла в порядке запросов."""
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayTransport:
+    """Записанные ответы вместо запросов к API, по порядку.
+
+    При ``speed`` каждый ответ задерживается на записанную длительность,
+    делённую на ``speed``; без него ответы отдаются сразу. Запросы, чьи
+    параметры отличаются от записанных, считаются в ``mismatches``.
+    """
+
+    def __init__(self, captures, speed=None, sleep=time.sleep):
+        self.captures = iter(captures)
+        self.speed = speed
+        self.sleep = sleep
+        self.served = 0
+        self.mismatches = 0
+
+    def get(self, url, params=None, **kwargs):
+        capture = next(self.captures, None)
+        if capture is None:
+            raise EOFError('Записанные ответы закончились')
+        self.served += 1
+        if (params or {}) != capture['params']:
+            self.mismatches += 1
+            logging.warning('Параметры запроса %s отличаются от записи %s',
+                            params, capture['params'])
+        if self.speed:
+            self.sleep(capture['elapsed'] / self.speed)
+        if 'error' in capture:
+            raise replay_error(capture)
+        return CapturedResponse(capture)
+
+
+class NullBot:
+    """Бот, который только запоминает сообщения, для прогонов без сети."""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, chat_id, text):
+        self.messages.append((chat_id, text))
+
+
+def replay(captures, bot, speed=None, store=None, sleep=time.sleep,
+           clock=time.monotonic):
+    """Прогон записанного трафика через конвейер бота.
+
+    Ответы подаются в ``poll_cycle`` с записанными паузами между
+    запросами, ускоренными в ``speed`` раз, или подряд без пауз.
+    Автомат защиты на время прогона подменяется своим, который не
+    размыкается: каждая запись доходит до конвейера, а цепь процесса
+    остаётся как была. Возвращает сводку прогона.
+    """
+    import homework
+    from alerts import ErrorAggregator
+    from breaker import CircuitBreaker
+    from scheduler import FixedScheduler
+    from state import StateStore
+
+    transport = ReplayTransport(captures, speed, sleep)
+    scheduler = FixedScheduler(0)
+    alerts = ErrorAggregator()
+    own_store = store is None
+    store = store or StateStore(':memory:')
+    cursor = 1
+    if captures:
+        cursor = int(captures[0]['params'].get('from_date', 1))
+        cursor += homework.CURSOR_OVERLAP if cursor > 1 else 0
+    previous = homework.api_client, homework.PRACTICUM_BREAKER
+    homework.api_client = transport
+    homework.PRACTICUM_BREAKER = CircuitBreaker(
+        'replay', is_failure=lambda error: False)
+    started = clock()
+    try:
+        for capture in captures:
+            if speed:
+                offset = (capture['time'] - captures[0]['time']) / speed
+                sleep(max(0.0, started + offset - clock()))
+            cursor = homework.poll_cycle(
+                bot, store, scheduler, alerts, cursor)
+    finally:
+        homework.api_client, homework.PRACTICUM_BREAKER = previous
+        if own_store:
+            store.close()
+    return {
+        'requests': transport.served,
+        'errors': scheduler.errors,
+        'mismatches': transport.mismatches,
+        'seconds': clock() - started,
+        'cursor': cursor,
+    }
+
+
+def main():
+    """Воспроизведение ``CAPTURE_FILE`` без отправки сообщений."""
+    bot = NullBot()
+    summary = replay(load_captures(), bot, speed=REPLAY_SPEED or None)
+    logging.info('Воспроизведено %s запросов, отправлено %s сообщений: %s',
+                 summary['requests'], len(bot.messages), summary)
+
+
+if __name__ == '__main__':
+    listener = setup_logging()
+    try:
+        main()
+    finally:
+        listener.stop()
@@ -0,0 +1,131 @@
+import os
+import random
+
+from records import Homework
+from state import homework_key
+
+SCHEDULER = os.getenv('SCHEDULER', 'adaptive')
+REVIEWING_INTERVAL = os.getenv('REVIEWING_INTERVAL')
+IDLE_MAX_INTERVAL = float(os.getenv('IDLE_MAX_INTERVAL', 600))
+ERROR_MAX_INTERVAL = float(os.getenv('ERROR_MAX_INTERVAL', 300))
+IDLE_FACTOR = 1.5
+
+
+class FixedScheduler:
+    """Опрос с постоянным интервалом, как раньше делал ``main()``."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.polls = 0
+        self.errors = 0
+        self.waited = 0.0
+
+    def record(self, homeworks):
+        """Учёт успешного опроса и работ с изменившимся статусом."""
+        self.polls += 1
+
+    def seed(self, statuses):
+        """Состояние из сохранённых статусов ``{key: (status, date)}``."""
+
+    def observe(self, homeworks):
+        """Учёт работ, пришедших не из опроса, например через webhook."""
+
+    def record_error(self, error):
+        """Учёт неудачного опроса."""
+        self.polls += 1
+        self.errors += 1
+
+    def next_delay(self):
+        """Пауза перед следующим опросом."""
+        self.waited += self.interval
+        return self.interval
+
+    @property
+    def polls_avoided(self):
+        """Сколько опросов пропущено по сравнению с базовым интервалом."""
+        if not self.interval:
+            return 0
+        return max(0, int(self.waited // self.interval) - self.polls)
+
+    def metrics(self):
+        return {
+            'polls': self.polls,
+            'errors': self.errors,
+            'polls_avoided': self.polls_avoided,
+        }
+
+
+class AdaptiveScheduler(FixedScheduler):
+    """Интервал подстраивается под активность и ошибки API.
+
+    Пока есть работы в статусе ``reviewing``, опрос идёт часто; после
+    пустых ответов интервал растёт до ``idle_max``; после ошибок —
+    экспоненциальная задержка с джиттером до ``error_max``.
+    """
+
+    def __init__(self, interval, reviewing_interval=REVIEWING_INTERVAL,
+                 idle_max=IDLE_MAX_INTERVAL, error_max=ERROR_MAX_INTERVAL,
+                 idle_factor=IDLE_FACTOR, rng=random):
+        super().__init__(interval)
+        self.reviewing_interval = float(reviewing_interval or interval)
+        self.idle_max = idle_max
+        self.error_max = error_max
+        self.idle_factor = idle_factor
+        self.rng = rng
+        self.reviewing = set()
+        self.idle_streak = 0
+        self.failures = 0
+
+    def record(self, homeworks):
+        super().record(homeworks)
+        self.failures = 0
+        if not homeworks:
+            self.idle_streak += 1
+            return
+        self.idle_streak = 0
+        self.observe(homeworks)
+
+    def seed(self, statuses):
+        self.reviewing.update(
+            key for key, (status, _) in statuses.items()
+            if status == 'reviewing')
+
+    def observe(self, homeworks):
+        for homework in homeworks:
+            if not isinstance(homework, (dict, Homework)):
+                continue
+            key = homework_key(homework)
+            if homework.get('status') == 'reviewing':
+                self.reviewing.add(key)
+            else:
+                self.reviewing.discard(key)
+
+    def record_error(self, error):
+        super().record_error(error)
+        self.failures += 1
+
+    def next_delay(self):
+        if self.failures:
+            ceiling = min(self.error_max,
+                          self.interval * 2 ** self.failures)
+            delay = ceiling / 2 + self.rng.uniform(0, ceiling / 2)
+        elif self.reviewing:
+            delay = self.reviewing_interval
+        else:
+            delay = min(self.idle_max,
+                        self.interval * self.idle_factor ** self.idle_streak)
+        self.waited += delay
+        return delay
+
+
+SCHEDULERS = {
+    'fixed': FixedScheduler,
+    'adaptive': AdaptiveScheduler,
+}
+
+
+def create_scheduler(interval, name=SCHEDULER, **kwargs):
+    """Планировщик по имени из переменной окружения ``SCHEDULER``."""
+    if name not in SCHEDULERS:
+        raise KeyError(f'Неизвестный планировщик: {name}')
+    return SCHEDULERS[name](interval, **kwargs)
@@ -0,0 +1,265 @@
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import time
+
+import homework
+from log import setup_logging
+from state import STATE_PATH, StateStore
+from tenants import (CONCURRENCY, MultiTenantPoller, Tenant, TenantRegistry,
+                     check_telegram_token)
+
+SHARD_WORKERS = int(os.getenv('SHARD_WORKERS', os.cpu_count() or 1))
+SHARD_REPLICAS = 100
+SHARD_START_METHOD = os.getenv('SHARD_START_METHOD', 'fork')
+SUPERVISE_INTERVAL = float(os.getenv('SUPERVISE_INTERVAL', 5))
+STOP_TIMEOUT = 10
+
+
+def ring_hash(key):
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Консистентное хеширование арендаторов по воркерам.
+
+    У каждого воркера ``replicas`` виртуальных точек на кольце; при
+    добавлении или удалении воркера переезжают только арендаторы,
+    попавшие на его участки.
+    """
+
+    def __init__(self, nodes=(), replicas=SHARD_REPLICAS):
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            point = ring_hash(f'{node}#{replica}')
+            bisect.insort(self._points, point)
+            self._owners[point] = node
+
+    def remove(self, node):
+        points = [point for point, owner in self._owners.items()
+                  if owner == node]
+        for point in points:
+            del self._owners[point]
+            self._points.remove(point)
+
+    def node_for(self, key):
+        if not self._points:
+            raise LookupError('На кольце нет воркеров')
+        index = bisect.bisect(self._points, ring_hash(key))
+        return self._owners[self._points[index % len(self._points)]]
+
+    def assign(self, keys):
+        """Ключи, сгруппированные по воркерам."""
+        plan = {}
+        for key in keys:
+            plan.setdefault(self.node_for(key), []).append(key)
+        return plan
+
+    def __len__(self):
+        return len(set(self._owners.values()))
+
+
+class ShardWorker:
+    """Опрос своего шарда арендаторов в отдельном процессе.
+
+    Между циклами опроса ждёт в ``inbox`` новое назначение: список
+    арендаторов или ``None`` для остановки. Курсоры и статусы
+    принятых арендаторов берутся из общего ``StateStore``.
+    """
+
+    def __init__(self, name, inbox, bot, store,
+                 retry_time=homework.RETRY_TIME, concurrency=CONCURRENCY):
+        self.name = name
+        self.inbox = inbox
+        self.store = store
+        self.retry_time = retry_time
+        self.poller = MultiTenantPoller(
+            TenantRegistry(), bot, concurrency, store=store)
+
+    def assign(self, tenants):
+        """Новое назначение шарда.
+
+        Из ``store`` загружаются только вновь принятые арендаторы, а
+        отданные другим шардам выгружаются из памяти.
+        """
+        kept = {tenant.name: tenant for tenant in self.poller.registry}
+        registry = TenantRegistry()
+        for item in tenants:
+            tenant = kept.pop(item['name'], None)
+            if tenant is None:
+                tenant = Tenant(**item)
+                self.poller.load(tenant)
+            registry.add(tenant)
+        self.store.flush()
+        for name in kept:
+            self.poller.release(name)
+        self.poller.registry = registry
+        logging.info('Шард %s: арендаторов %s', self.name, len(registry))
+
+    def run(self):
+        deadline = 0
+        while True:
+            try:
+                tenants = self.inbox.get(
+                    timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.poller.poll_all()
+                deadline = time.monotonic() + self.retry_time
+                continue
+            if tenants is None:
+                return
+            self.assign(tenants)
+
+    def close(self):
+        self.poller.close()
+
+
+def run_shard(name, inbox, retry_time=homework.RETRY_TIME,
+              concurrency=CONCURRENCY, state_path=STATE_PATH):
+    """Точка входа процесса-шарда: свой бот, пул соединений и SQLite."""
+    from telegram import Bot
+
+    listener = setup_logging()
+    try:
+        bot = Bot(token=homework.TELEGRAM_TOKEN)
+        with StateStore(state_path) as store:
+            worker = ShardWorker(
+                name, inbox, bot, store, retry_time, concurrency)
+            try:
+                worker.run()
+            finally:
+                worker.close()
+    finally:
+        listener.stop()
+
+
+class ShardSupervisor:
+    """Распределение арендаторов по пулу процессов.
+
+    Держит ``size`` воркеров; умерший воркер убирается с кольца, его
+    арендаторы сразу переходят к остальным, а на его место запускается
+    новый. Воркеру отправляется назначение только если оно изменилось.
+    """
+
+    def __init__(self, registry, size=SHARD_WORKERS,
+                 retry_time=homework.RETRY_TIME, concurrency=CONCURRENCY,
+                 state_path=STATE_PATH, target=run_shard,
+                 start_method=SHARD_START_METHOD):
+        self.registry = registry
+        self.size = size
+        self.args = (retry_time, concurrency, state_path)
+        self.target = target
+        self.context = multiprocessing.get_context(start_method)
+        self.ring = HashRing()
+        self.workers = {}
+        self.assignment = {}
+        self._next_id = 0
+
+    def _spawn(self):
+        name = f'shard{self._next_id}'
+        self._next_id += 1
+        inbox = self.context.Queue()
+        process = self.context.Process(
+            target=self.target, args=(name, inbox) + self.args,
+            name=name, daemon=True)
+        process.start()
+        self.workers[name] = (process, inbox)
+        self.ring.add(name)
+        return name
+
+    def start(self):
+        for _ in range(self.size):
+            self._spawn()
+        self.rebalance()
+        return self
+
+    def add_worker(self):
+        name = self._spawn()
+        self.rebalance()
+        return name
+
+    def remove_worker(self, name):
+        process, inbox = self.workers.pop(name)
+        self.ring.remove(name)
+        self.assignment.pop(name, None)
+        inbox.put(None)
+        process.join(STOP_TIMEOUT)
+        self.rebalance()
+
+    def rebalance(self):
+        """Рассылка назначений; возвращает число переехавших арендаторов."""
+        plan = self.ring.assign(tenant.name for tenant in self.registry)
+        moved = 0
+        for name, (_, inbox) in self.workers.items():
+            tenants = set(plan.get(name, ()))
+            if tenants == self.assignment.get(name):
+                continue
+            moved += len(tenants - self.assignment.get(name, set()))
+            self.assignment[name] = tenants
+            inbox.put([self.registry.get(tenant).to_dict()
+                       for tenant in sorted(tenants)])
+        return moved
+
+    def reap(self):
+        """Убирает умершие воркеры с кольца и перераспределяет шарды."""
+        dead = [name for name, (process, _) in self.workers.items()
+                if not process.is_alive()]
+        for name in dead:
+            process, _ = self.workers.pop(name)
+            logging.error('Шард %s завершился с кодом %s',
+                          name, process.exitcode)
+            self.ring.remove(name)
+            self.assignment.pop(name)
+        if dead and self.workers:
+            self.rebalance()
+        return dead
+
+    def supervise(self):
+        self.reap()
+        while len(self.workers) < self.size:
+            self.add_worker()
+
+    def run(self, interval=SUPERVISE_INTERVAL):
+        while True:
+            self.supervise()
+            time.sleep(interval)
+
+    def close(self):
+        for process, inbox in self.workers.values():
+            inbox.put(None)
+        for process, _ in self.workers.values():
+            process.join(STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        self.workers.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    """Опрос арендаторов из ``TENANTS_FILE`` пулом процессов."""
+    check_telegram_token()
+    with ShardSupervisor(TenantRegistry.load()) as supervisor:
+        supervisor.run()
+
+
+if __name__ == '__main__':
+    listener = setup_logging()
+    try:
+        main()
+    finally:
+        listener.stop()
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import threading
+
+STATE_PATH = os.getenv('STATE_PATH', 'state.sqlite3')
+BATCH_SIZE = 100
+DEFAULT_CURSOR = 'default'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statuses (
+    homework_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    date_updated TEXT
+);
+"""
+
+
+def homework_key(homework, scope=None):
+    """Ключ работы: ``id`` из ответа API или её название.
+
+    ``scope`` — арендатор: у разных студентов могут быть работы с
+    одинаковым названием, и их статусы не должны смешиваться.
+    """
+    key = str(homework.get('id', homework.get('homework_name')))
+    return key if scope is None else f'{scope}/{key}'
+
+
+class StateStore:
+    """Курсор ``from_date`` и последние статусы работ в SQLite.
+
+    База открывается в режиме WAL: после падения процесса SQLite сам
+    восстанавливает последнюю зафиксированную транзакцию. Записи копятся
+    в памяти и фиксируются одной транзакцией в ``flush()``.
+    """
+
+    def __init__(self, path=STATE_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._statuses = {}
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def get_cursor(self, name=DEFAULT_CURSOR, default=1):
+        """Сохранённый курсор или ``default`` при первом запуске."""
+        with self._lock:
+            if name in self._cursors:
+                return self._cursors[name]
+            row = self.connection.execute(
+                'SELECT value FROM cursors WHERE name = ?', (name,)
+            ).fetchone()
+        return default if row is None else row[0]
+
+    def set_cursor(self, value, name=DEFAULT_CURSOR):
+        with self._lock:
+            self._cursors[name] = value
+        self._maybe_flush()
+
+    def load_statuses(self, scope=None):
+        """Известные статусы: ``{homework_id: (status, date_updated)}``.
+
+        С ``scope`` — только статусы этого арендатора. Порядок — по
+        ``date_updated``, как у ``OLD_STATUSES`` в работе.
+        """
+        self.flush()
+        where, params = '', ()
+        if scope is not None:
+            # Ключи арендатора — от «scope/» до «scope0»: '0' идёт за '/'.
+            where, params = 'WHERE homework_id >= ? AND homework_id < ? ', (
+                f'{scope}/', f'{scope}0')
+        rows = self.connection.execute(
+            'SELECT homework_id, status, date_updated FROM statuses '
+            + where + 'ORDER BY date_updated IS NULL, date_updated', params)
+        return {key: (status, date) for key, status, date in rows}
+
+    def set_status(self, homework, scope=None):
+        with self._lock:
+            self._statuses[homework_key(homework, scope)] = (
+                homework.get('status'), homework.get('date_updated'))
+        self._maybe_flush()
+
+    def forget_status(self, key):
+        with self._lock:
+            self._statuses[key] = None
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._cursors) + len(self._statuses) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Фиксация накопленных записей одной транзакцией."""
+        with self._lock:
+            cursors, self._cursors = self._cursors, {}
+            statuses, self._statuses = self._statuses, {}
+            if not cursors and not statuses:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO cursors VALUES (?, ?)',
+                    cursors.items())
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)',
+                    ((key,) + value for key, value in statuses.items()
+                     if value is not None))
+                self.connection.executemany(
+                    'DELETE FROM statuses WHERE homework_id = ?',
+                    ((key,) for key, value in statuses.items()
+                     if value is None))
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,153 @@
+import codecs
+import json
+import os
+import zlib
+
+CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 64 * 1024))
+WHITESPACE = ' \t\n\r'
+DECODER = json.JSONDecoder()
+HOMEWORKS_START = object()
+WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+
+def iter_body(response, chunk_size=CHUNK_SIZE):
+    """Тело ответа кусками не больше ``chunk_size`` после распаковки.
+
+    ``iter_content`` распаковывает gzip целиком для каждого прочитанного
+    куска, и хорошо сжатый ответ превращается в мегабайты за раз.
+    """
+    encoding = response.headers.get('Content-Encoding', '').lower()
+    if encoding not in WBITS:
+        yield from response.iter_content(chunk_size=chunk_size)
+        return
+    decompressor = zlib.decompressobj(WBITS[encoding])
+    for data in response.raw.stream(chunk_size, decode_content=False):
+        while data:
+            yield decompressor.decompress(data, chunk_size)
+            data = decompressor.unconsumed_tail
+    yield decompressor.flush()
+
+
+class HomeworkStream:
+    """Ответ API, который разбирается по мере чтения тела.
+
+    ``stream['homeworks']`` возвращает генератор работ: первая работа
+    доступна, как только она пришла целиком. Остальные ключи ответа
+    (``current_date``) читаются после массива; если запросить их раньше,
+    непрочитанные работы буферизуются. Поток читается один раз.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._events = self._parse()
+        self._started = False
+        self._items = []
+        self.meta = {}
+
+    @classmethod
+    def from_response(cls, response, chunk_size=CHUNK_SIZE):
+        return cls(iter_body(response, chunk_size))
+
+    def _fill(self):
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            text = self._decoder.decode(b'', final=True)
+            self._eof = True
+        elif isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk)
+        else:
+            text = chunk
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+
+    def _peek(self):
+        """Следующий значимый символ или пустая строка в конце потока."""
+        while True:
+            while (self._pos < len(self._buffer)
+                   and self._buffer[self._pos] in WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._fill()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise json.JSONDecodeError(
+                f'Ожидался символ {char!r}', self._buffer, self._pos)
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()
+                continue
+            if end == len(self._buffer) and not self._eof:
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def _parse(self):
+        if self._peek() != '{':
+            raise TypeError('Ответ API не является словарём')
+        self._pos += 1
+        while self._peek() != '}':
+            if self._peek() == ',':
+                self._pos += 1
+            key = self._value()
+            self._expect(':')
+            if key != 'homeworks' or self._peek() != '[':
+                self.meta[key] = self._value()
+                continue
+            self._pos += 1
+            yield HOMEWORKS_START
+            while self._peek() != ']':
+                if self._peek() == ',':
+                    self._pos += 1
+                yield self._value()
+            self._pos += 1
+
+    def _drain(self):
+        for event in self._events:
+            if event is HOMEWORKS_START:
+                self._started = True
+            else:
+                self._items.append(event)
+
+    def _stream_items(self):
+        yield from self._items
+        self._items = []
+        for event in self._events:
+            yield event
+
+    def _homeworks(self):
+        if not self._started:
+            for event in self._events:
+                if event is HOMEWORKS_START:
+                    self._started = True
+                    break
+            else:
+                return self.meta['homeworks']
+        return self._stream_items()
+
+    def __getitem__(self, key):
+        if key == 'homeworks':
+            return self._homeworks()
+        if key not in self.meta:
+            self._drain()
+        return self.meta[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
@@ -0,0 +1,65 @@
+import json
+import os
+
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE', 'subscriptions.json')
+
+
+class Subscriptions:
+    """Чаты, которые получают вердикты.
+
+    ``chats`` подписаны на все работы, ``homeworks`` — на отдельные
+    работы по имени. Файл подписок — JSON с теми же ключами::
+
+        {"chats": ["-100123"], "homeworks": {"hw1": ["42", "43"]}}
+    """
+
+    def __init__(self, chats=(), homeworks=None):
+        self.chats = unique(chats)
+        self.homeworks = {
+            name: unique(chat_ids)
+            for name, chat_ids in (homeworks or {}).items()}
+
+    @classmethod
+    def load(cls, path=SUBSCRIPTIONS_FILE, chats=()):
+        """Подписки из файла; ``chats`` добавляются к общим чатам."""
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            data = {}
+        return cls([*chats, *data.get('chats', ())], data.get('homeworks'))
+
+    def save(self, path=SUBSCRIPTIONS_FILE):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'chats': self.chats, 'homeworks': self.homeworks},
+                      file, ensure_ascii=False, indent=2)
+
+    def subscribe(self, chat_id, homework_name=None):
+        """Подписка чата на все работы или на работу ``homework_name``."""
+        chat_ids = (self.chats if homework_name is None
+                    else self.homeworks.setdefault(homework_name, []))
+        if str(chat_id) not in chat_ids:
+            chat_ids.append(str(chat_id))
+
+    def unsubscribe(self, chat_id, homework_name=None):
+        chat_ids = (self.chats if homework_name is None
+                    else self.homeworks.get(homework_name, []))
+        if str(chat_id) in chat_ids:
+            chat_ids.remove(str(chat_id))
+
+    def chats_for(self, homework):
+        """Чаты, которым нужно отправить вердикт по работе."""
+        specific = self.homeworks.get(homework.get('homework_name'))
+        if not specific:
+            return self.chats
+        return unique([*self.chats, *specific])
+
+    def __len__(self):
+        return len(unique([
+            *self.chats, *(chat_id for chat_ids in self.homeworks.values()
+                           for chat_id in chat_ids)]))
+
+
+def unique(chat_ids):
+    """Идентификаторы чатов строками, без повторов, в исходном порядке."""
+    return list(dict.fromkeys(str(chat_id) for chat_id in chat_ids))
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from alerts import ErrorAggregator
+from delivery import OutboundQueue, pooled_bot
+from log import setup_logging
+from outbox import Outbox
+from practicum import PracticumClient
+from state import StateStore
+
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+CONCURRENCY = int(os.getenv('TENANTS_CONCURRENCY', 16))
+
+
+class Tenant:
+    """Студент: свой токен Практикума, чат и курсор ``from_date``."""
+
+    __slots__ = ('name', 'token', 'chat_id', 'cursor', 'headers')
+
+    def __init__(self, name, token, chat_id, cursor=1):
+        self.name = name
+        self.token = token
+        self.chat_id = chat_id
+        self.cursor = cursor
+        self.headers = {'Authorization': f'OAuth {token}'}
+
+    def to_dict(self):
+        return {'name': self.name, 'token': self.token,
+                'chat_id': self.chat_id, 'cursor': self.cursor}
+
+    def __repr__(self):
+        return f'Tenant({self.name!r}, chat_id={self.chat_id!r})'
+
+
+class TenantRegistry:
+    """Реестр арендаторов, которых опрашивает один процесс."""
+
+    def __init__(self, tenants=()):
+        self._tenants = {}
+        for tenant in tenants:
+            self.add(tenant)
+
+    @classmethod
+    def load(cls, path=TENANTS_FILE):
+        """Загрузка реестра из JSON-файла со списком арендаторов."""
+        with open(path, encoding='utf-8') as file:
+            return cls(Tenant(**item) for item in json.load(file))
+
+    def save(self, path=TENANTS_FILE):
+        """Сохранение реестра вместе с курсорами."""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([tenant.to_dict() for tenant in self], file,
+                      ensure_ascii=False, indent=2)
+
+    def add(self, tenant):
+        if tenant.name in self._tenants:
+            raise KeyError(f'Арендатор {tenant.name} уже зарегистрирован')
+        self._tenants[tenant.name] = tenant
+
+    def remove(self, name):
+        return self._tenants.pop(name)
+
+    def get(self, name):
+        return self._tenants[name]
+
+    def __iter__(self):
+        return iter(list(self._tenants.values()))
+
+    def __len__(self):
+        return len(self._tenants)
+
+
+class MultiTenantPoller:
+    """Опрос всех арендаторов через пул потоков и общий пул соединений."""
+
+    def __init__(self, registry, bot, concurrency=CONCURRENCY, client=None,
+                 store=None):
+        self.registry = registry
+        self.bot = bot
+        self.store = store
+        self.alerts = {}
+        self.changes = []
+        if store is not None:
+            for tenant in registry:
+                self.load(tenant)
+        self.concurrency = concurrency
+        self.client = client or PracticumClient(pool_size=concurrency)
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='tenant')
+
+    def load(self, tenant):
+        """Курсор и отметки статусов арендатора из ``store``."""
+        tenant.cursor = self.store.get_cursor(tenant.name, tenant.cursor)
+        homework.statuses_for(tenant.name).update(
+            self.store.load_statuses(tenant.name))
+
+    def release(self, name):
+        """Выгрузка из памяти арендатора, которого опрашивает другой шард."""
+        homework.SCOPED_STATUSES.pop(name, None)
+        self.alerts.pop(name, None)
+
+    def poll_tenant(self, tenant):
+        """Один цикл опроса арендатора; возвращает число сообщений."""
+        alerts = self.alerts.get(tenant.name)
+        if alerts is None:
+            alerts = self.alerts[tenant.name] = ErrorAggregator()
+        sent = 0
+        try:
+            response = homework.fetch_statuses(
+                homework.window_start(tenant.cursor), tenant.headers,
+                self.client)
+            try:
+                homeworks = homework.diff_statuses(homework.to_records(
+                    homework.check_response(response)), tenant.name)
+                for homework_item in homeworks:
+                    if not homework.send_message_to(
+                            self.bot, tenant.chat_id,
+                            homework.parse_status(homework_item)):
+                        continue
+                    homework.remember_status(
+                        homework_item, scope=tenant.name)
+                    self.changes.append((homework_item, tenant.name))
+                    sent += 1
+            finally:
+                tenant.cursor = max(tenant.cursor, response['current_date'])
+            homework.prune_statuses(tenant.cursor, self.store, tenant.name)
+            message = alerts.resolve()
+        except Exception as error:
+            logging.error(
+                'Сбой опроса арендатора %s: %s', tenant.name, error)
+            message = alerts.report(error)
+        if message is not None:
+            homework.send_message_to(self.bot, tenant.chat_id, message)
+            sent += 1
+        return sent
+
+    def poll_all(self):
+        """Один проход по всем арендаторам.
+
+        Курсоры и статусы попадают в ``store`` после прохода, когда
+        сообщения уже отправлены или записаны в журнал отправки; статус
+        неотправленного сообщения не сохраняется.
+        """
+        sent = sum(self.executor.map(self.poll_tenant, self.registry))
+        changes, self.changes = self.changes, []
+        homework.commit_messages(self.bot)
+        if self.store is not None:
+            for homework_item, scope in changes:
+                self.store.set_status(homework_item, scope)
+            for tenant in self.registry:
+                self.store.set_cursor(tenant.cursor, tenant.name)
+            self.store.flush()
+        return sent
+
+    def run(self, retry_time=homework.RETRY_TIME):
+        while True:
+            self.poll_all()
+            time.sleep(retry_time)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def check_telegram_token():
+    """В режиме арендаторов токены Практикума берутся из реестра."""
+    if homework.TELEGRAM_TOKEN is None:
+        logging.critical(
+            'Отсутствует обязательная переменная окружения: TELEGRAM_TOKEN')
+        raise Exception('Программа принудительно остановлена.')
+
+
+def main():
+    """Опрос всех арендаторов из ``TENANTS_FILE``."""
+    check_telegram_token()
+    registry = TenantRegistry.load()
+    bot = OutboundQueue(
+        pooled_bot(homework.TELEGRAM_TOKEN), outbox=Outbox()).start()
+    try:
+        with StateStore() as store, \
+                MultiTenantPoller(registry, bot, store=store) as poller:
+            poller.run()
+    finally:
+        bot.close()
+
+
+if __name__ == '__main__':
+    listener = setup_logging()
+    try:
+        main()
+    finally:
+        listener.stop()
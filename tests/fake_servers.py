@@ -0,0 +1,200 @@
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeServer:
+    """Локальный HTTP-сервер в отдельном потоке."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, latency=0.0, error_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(self.handler_class):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            fake = server
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, args=(0.01,), daemon=True)
+
+    def delay(self):
+        """Задержка ответа; ``latency`` может быть функцией без аргументов."""
+        return self.latency() if callable(self.latency) else self.latency
+
+    def failed(self):
+        """Случайный сбой с вероятностью ``error_rate``."""
+        return self.error_rate and random.random() < self.error_rate
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class PracticumHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        fake = self.fake
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with fake._lock:
+            fake.requests.append(
+                {'path': url.path, 'params': params,
+                 'headers': dict(self.headers)})
+        delay = fake.delay()
+        if delay:
+            time.sleep(delay)
+        homeworks = fake.homeworks
+        if callable(homeworks):
+            homeworks = homeworks(self.headers.get('Authorization'), params)
+        data = {'homeworks': homeworks,
+                'current_date': fake.current_date}
+        body = json.dumps(data).encode()
+        self.send_response(500 if fake.failed() else fake.status_code)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakePracticumServer(FakeServer):
+    """Заглушка эндпоинта статусов домашних работ."""
+
+    handler_class = PracticumHandler
+    path = '/api/user_api/homework_statuses/'
+
+    def __init__(self, homeworks=None, current_date=None, status_code=200,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.homeworks = homeworks or []
+        self.current_date = current_date or int(time.time())
+        self.status_code = status_code
+
+    @property
+    def endpoint(self):
+        return self.url + self.path
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        fake = self.fake
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+        if self.headers.get('Content-Type', '').startswith(
+                'application/json'):
+            data = json.loads(raw or b'{}')
+        else:
+            data = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+        delay = fake.delay()
+        if delay:
+            time.sleep(delay)
+        method = self.path.rsplit('/', 1)[-1]
+        chat_id = str(data.get('chat_id'))
+        if fake.failed():
+            return self.reply(500, {
+                'ok': False, 'error_code': 500,
+                'description': 'Internal Server Error'})
+        if chat_id in fake.blocked_chats:
+            return self.reply(400, {
+                'ok': False, 'error_code': 400,
+                'description': 'Bad Request: chat not found'})
+        with fake._lock:
+            fake.requests.append({'method': method, 'data': data})
+            retry_after = fake.flood_wait(chat_id)
+            if retry_after:
+                fake.rejected += 1
+            elif method == 'sendMessage':
+                fake.messages.append((chat_id, data['text']))
+            message_id = len(fake.messages)
+        if retry_after:
+            return self.reply(429, {
+                'ok': False, 'error_code': 429,
+                'description': 'Too Many Requests',
+                'parameters': {'retry_after': retry_after}})
+        result = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text', ''),
+        }
+        self.reply(200, {'ok': True, 'result': result})
+
+    def reply(self, code, data):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeTelegramServer(FakeServer):
+    """Заглушка Telegram Bot API.
+
+    ``chat_interval`` включает флуд-контроль: сообщение в тот же чат
+    раньше, чем через ``chat_interval`` секунд, получает ответ 429.
+    Сообщения в ``blocked_chats`` отклоняются ответом 400.
+    """
+
+    handler_class = TelegramHandler
+
+    def __init__(self, chat_interval=0.0, blocked_chats=(), **kwargs):
+        super().__init__(**kwargs)
+        self.messages = []
+        self.blocked_chats = {str(chat_id) for chat_id in blocked_chats}
+        self.chat_interval = chat_interval
+        self.rejected = 0
+        self._last_sent = {}
+
+    def flood_wait(self, chat_id):
+        if not self.chat_interval:
+            return 0
+        now = time.monotonic()
+        wait = self._last_sent.get(chat_id, -1e9) + self.chat_interval - now
+        if wait > 0:
+            return max(round(wait, 3), 0.001)
+        self._last_sent[chat_id] = now
+        return 0
+
+    @property
+    def base_url(self):
+        return self.url + '/bot'
@@ -0,0 +1,46 @@
+from utils import FakeClock
+
+
+class TestErrorAggregator:
+
+    def test_first_error_then_digest_then_recovery(self):
+        from alerts import ErrorAggregator
+
+        clock = FakeClock()
+        alerts = ErrorAggregator(digest_interval=600, clock=clock)
+        first = alerts.report(Exception('Код ответа API: 503'))
+        assert first == 'Сбой в работе программы: Код ответа API: 503'
+
+        sent = []
+        for _ in range(143):
+            clock.now += 5
+            message = alerts.report(Exception('Код ответа API: 502'))
+            if message is not None:
+                sent.append(message)
+        assert len(sent) == 1, (
+            'Проверьте, что повторы одного сбоя уходят сводкой'
+        )
+        assert sent[0].endswith('Тот же сбой ×120 за 10 мин')
+        assert alerts.suppressed == 142
+
+        clock.now += 5
+        recovery = alerts.resolve()
+        assert recovery == (
+            'Работа программы восстановлена. Сбоев: 144 за 12 мин')
+        assert alerts.resolve() is None
+
+    def test_different_errors_are_sent(self):
+        from alerts import ErrorAggregator
+
+        alerts = ErrorAggregator(clock=FakeClock())
+        assert alerts.report(KeyError('homeworks')) is not None
+        assert alerts.report(TypeError('Это не словарь!')) is not None
+        assert alerts.report(KeyError('homeworks')) is None
+
+    def test_memory_is_bounded(self):
+        from alerts import ErrorAggregator
+
+        alerts = ErrorAggregator(max_fingerprints=10, clock=FakeClock())
+        for number in range(1000):
+            alerts.report(Exception(f'сбой {"x" * (number % 50)}'))
+        assert len(alerts.records) == 10
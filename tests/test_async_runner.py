@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import time
+
+import telegram
+from fake_servers import FakePracticumServer, FakeTelegramServer
+from utils import ALWAYS, RecordingBot, StreamedResponse
+
+HOMEWORKS = [
+    {'homework_name': 'hw1', 'status': 'approved'},
+    {'homework_name': 'hw2', 'status': 'reviewing'},
+]
+
+
+class TestAsyncPoller:
+
+    def setup_servers(self, monkeypatch, practicum, telegram_api):
+        import homework
+
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 42)
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        return telegram.Bot('1234:abcdefg', base_url=telegram_api.base_url)
+
+    def test_pipeline_delivers_messages(self, monkeypatch):
+        from async_runner import AsyncPoller
+
+        with FakePracticumServer(homeworks=HOMEWORKS) as practicum, \
+                FakeTelegramServer() as telegram_api:
+            bot = self.setup_servers(monkeypatch, practicum, telegram_api)
+            poller = AsyncPoller(bot, retry_time=0)
+            asyncio.run(poller.run(cycles=2))
+
+        assert len(practicum.requests) == 2
+        assert practicum.requests[0]['params']['from_date'] == '1'
+        assert poller.current_timestamp == practicum.current_date
+        texts = [text for _, text in telegram_api.messages]
+        assert len(texts) == 2, (
+            'Проверьте, что повторные статусы не отправляются'
+        )
+        assert texts[0] == (
+            'Изменился статус проверки работы "hw1". '
+            'Работа проверена: ревьюеру всё понравилось. Ура!'
+        )
+        assert {chat for chat, _ in telegram_api.messages} == {'42'}
+
+    def test_restart_resumes_from_store(self, monkeypatch, tmp_path):
+        import homework
+        from async_runner import AsyncPoller
+        from state import StateStore
+
+        path = str(tmp_path / 'state.sqlite3')
+        with FakePracticumServer(homeworks=HOMEWORKS,
+                                 current_date=5000) as practicum, \
+                FakeTelegramServer() as telegram_api:
+            bot = self.setup_servers(monkeypatch, practicum, telegram_api)
+            for _ in range(2):
+                monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+                with StateStore(path) as store:
+                    poller = AsyncPoller(bot, retry_time=0, store=store)
+                    asyncio.run(poller.run(cycles=1))
+
+        dates = [request['params']['from_date']
+                 for request in practicum.requests]
+        assert dates == ['1', str(5000 - homework.CURSOR_OVERLAP)]
+        assert len(telegram_api.messages) == 2, (
+            'Проверьте, что после перезапуска статусы не отправляются повторно'
+        )
+
+    def test_slow_sends_do_not_delay_polling(self, monkeypatch):
+        from async_runner import AsyncPoller
+
+        counter = itertools.count()
+
+        def fresh_homeworks(authorization, params):
+            return [{'id': next(counter), 'homework_name': 'hw',
+                     'status': 'reviewing'} for _ in range(2)]
+
+        with FakePracticumServer(homeworks=fresh_homeworks) as practicum, \
+                FakeTelegramServer(latency=0.1) as telegram_api:
+            bot = self.setup_servers(monkeypatch, practicum, telegram_api)
+            poller = AsyncPoller(bot, retry_time=0, queue_size=10)
+
+            async def scenario():
+                started = time.monotonic()
+                runner = asyncio.create_task(poller.run(cycles=3))
+                while len(practicum.requests) < 3:
+                    await asyncio.sleep(0.01)
+                polled = time.monotonic() - started
+                await runner
+                return polled
+
+            polled = asyncio.run(scenario())
+
+        assert polled < 0.3, (
+            'Проверьте, что опрос API не ждёт отправки сообщений'
+        )
+        assert len(telegram_api.messages) == 6
+
+    def test_api_error_is_reported(self, monkeypatch):
+        from async_runner import AsyncPoller
+
+        with FakePracticumServer(status_code=500) as practicum, \
+                FakeTelegramServer() as telegram_api:
+            bot = self.setup_servers(monkeypatch, practicum, telegram_api)
+            asyncio.run(AsyncPoller(bot, retry_time=0).run(cycles=1))
+
+        assert len(telegram_api.messages) == 1
+        assert telegram_api.messages[0][1].startswith(
+            'Сбой в работе программы')
+
+    def test_cursor_is_read_after_streamed_homeworks(self, monkeypatch):
+        import homework
+        from async_runner import AsyncPoller
+
+        response = StreamedResponse(HOMEWORKS, 5000)
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: response)
+        monkeypatch.setattr(homework, 'send_message', lambda bot, text: None)
+        poller = AsyncPoller(bot=None, retry_time=0)
+        asyncio.run(poller.run(cycles=1))
+
+        assert response.events == ['homework', 'homework', 'current_date']
+        assert poller.current_timestamp == 5000
+
+    def test_old_statuses_are_forgotten(self, monkeypatch):
+        import homework
+        from async_runner import AsyncPoller
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {
+            'old': ('approved', '2022-01-01T00:00:00Z')})
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [], 'current_date': 1646092800})
+        asyncio.run(AsyncPoller(bot=None, retry_time=0).run(cycles=1))
+
+        assert homework.OLD_STATUSES == {}, (
+            'Проверьте, что асинхронный опрос забывает старые статусы'
+        )
+
+    def test_bad_homework_does_not_lose_earlier_ones(self, monkeypatch):
+        import homework
+        from async_runner import AsyncPoller
+
+        sent = []
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'weird'},
+                {'id': 3, 'homework_name': 'hw3', 'status': 'approved'}],
+            'current_date': 1000})
+        monkeypatch.setattr(homework, 'send_message',
+                            lambda bot, text: sent.append(text))
+        asyncio.run(AsyncPoller(bot=None, retry_time=0).run(cycles=1))
+
+        assert sent[0] == homework.parse_status(
+            {'homework_name': 'hw1', 'status': 'approved'}), (
+            'Проверьте, что работы до ошибочной всё равно отправляются'
+        )
+        assert sent[1].startswith('Сбой в работе программы')
+        assert list(homework.OLD_STATUSES) == ['1']
+
+    def test_failed_send_is_not_stored(self, monkeypatch, tmp_path):
+        import homework
+        from async_runner import AsyncPoller
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}],
+            'current_date': 1000})
+        path = str(tmp_path / 'state.sqlite3')
+        bots = [RecordingBot(failures=ALWAYS), RecordingBot()]
+        for bot in bots:
+            monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+            with StateStore(path) as store:
+                asyncio.run(AsyncPoller(
+                    bot, retry_time=0, store=store).run(cycles=1))
+
+        assert len(bots[1].messages) == 1, (
+            'Проверьте, что статус сохраняется только после отправки'
+        )
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+import requests
+from fake_servers import FakePracticumServer
+from utils import FakeClock
+
+
+def fail(breaker, error=ConnectionError('сбой')):
+    with pytest.raises(type(error)):
+        with breaker:
+            raise error
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_recovers(self):
+        from breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker,
+                             CircuitOpenError)
+        from metrics import BREAKER_REJECTED, BREAKER_TRANSITIONS
+
+        clock = FakeClock()
+        events = []
+        breaker = CircuitBreaker('unit', failure_threshold=3,
+                                 reset_timeout=10, clock=clock)
+        breaker.add_listener(
+            lambda breaker, old, new: events.append((old, new)))
+        for _ in range(3):
+            fail(breaker)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            with breaker:
+                pass
+        assert BREAKER_REJECTED.labels('unit').value == 1
+
+        clock.now = 10
+        with breaker:
+            assert breaker.state == HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                with breaker:
+                    pass
+        assert breaker.state == CLOSED
+        assert events == [(CLOSED, OPEN), (OPEN, HALF_OPEN),
+                          (HALF_OPEN, CLOSED)]
+        assert BREAKER_TRANSITIONS.labels('unit', OPEN).value == 1
+
+    def test_failed_trial_reopens(self):
+        from breaker import OPEN, CircuitBreaker
+
+        clock = FakeClock()
+        breaker = CircuitBreaker('trial', failure_threshold=1,
+                                 reset_timeout=5, clock=clock)
+        fail(breaker)
+        clock.now = 5
+        fail(breaker)
+        assert breaker.state == OPEN
+        assert breaker.retry_in == 5
+
+    def test_success_resets_failure_count(self):
+        from breaker import CLOSED, CircuitBreaker
+
+        breaker = CircuitBreaker('reset', failure_threshold=2)
+        for _ in range(5):
+            fail(breaker)
+            with breaker:
+                pass
+        assert breaker.state == CLOSED
+
+
+class TestPracticumBreaker:
+
+    @pytest.fixture
+    def breaker(self, monkeypatch):
+        import homework
+        from breaker import CircuitBreaker
+
+        breaker = CircuitBreaker('practicum-test', failure_threshold=3,
+                                 reset_timeout=60,
+                                 is_failure=homework.is_server_failure)
+        monkeypatch.setattr(homework, 'PRACTICUM_BREAKER', breaker)
+        return breaker
+
+    def test_5xx_storm_fails_fast(self, monkeypatch, breaker):
+        import homework
+        from breaker import CircuitOpenError
+
+        with FakePracticumServer(status_code=503) as practicum:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            for _ in range(3):
+                with pytest.raises(homework.APIError):
+                    homework.get_api_answer(1)
+            started = time.perf_counter()
+            for _ in range(100):
+                with pytest.raises(CircuitOpenError):
+                    homework.get_api_answer(1)
+            elapsed = time.perf_counter() - started
+        assert len(practicum.requests) == 3, (
+            'Проверьте, что разомкнутая цепь не обращается к эндпоинту'
+        )
+        assert elapsed < 0.1
+
+    def test_hang_is_cut_by_read_timeout(self, monkeypatch, breaker):
+        import homework
+        import practicum
+
+        monkeypatch.setattr(practicum, 'DEFAULT_TIMEOUT', (0.5, 0.1))
+        with FakePracticumServer(latency=1) as server:
+            monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+            started = time.perf_counter()
+            with pytest.raises(requests.exceptions.Timeout):
+                homework.get_api_answer(1)
+            assert time.perf_counter() - started < 0.5
+        assert breaker.failures == 1
+
+    def test_client_errors_do_not_open(self, monkeypatch, breaker):
+        import homework
+        from breaker import CLOSED
+
+        with FakePracticumServer(status_code=401) as practicum:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            for _ in range(5):
+                with pytest.raises(homework.APIError):
+                    homework.get_api_answer(1)
+        assert breaker.state == CLOSED
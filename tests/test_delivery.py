@@ -0,0 +1,82 @@
+import telegram
+from fake_servers import FakeTelegramServer
+from utils import ALWAYS, RecordingBot
+
+
+class TestOutboundQueue:
+
+    def test_token_bucket(self):
+        from delivery import TokenBucket
+
+        bucket = TokenBucket(rate=2, capacity=1, now=0)
+        assert bucket.delay(0) == 0
+        bucket.consume()
+        assert bucket.delay(0) == 0.5
+        assert bucket.delay(0.5) == 0
+
+    def test_pending_messages_are_coalesced(self):
+        from delivery import OutboundQueue
+
+        with FakeTelegramServer() as telegram_api:
+            bot = telegram.Bot('1234:abcdefg',
+                               base_url=telegram_api.base_url)
+            queue = OutboundQueue(bot, workers=1)
+            for number in range(5):
+                queue.send_message(42, f'сообщение {number}')
+            queue.send_message(43, 'другой чат')
+            with queue:
+                assert queue.flush(timeout=5)
+
+        assert sorted(telegram_api.messages) == [
+            ('42', '\n\n'.join(f'сообщение {n}' for n in range(5))),
+            ('43', 'другой чат'),
+        ]
+        assert queue.sent == 2
+        assert queue.coalesced == 4
+
+    def test_retry_after_is_honoured(self):
+        from delivery import OutboundQueue
+
+        with FakeTelegramServer(chat_interval=0.2) as telegram_api:
+            bot = telegram.Bot('1234:abcdefg',
+                               base_url=telegram_api.base_url)
+            with OutboundQueue(bot, chat_rate=100) as queue:
+                queue.send_message(42, 'первое')
+                assert queue.flush(timeout=5)
+                queue.send_message(42, 'второе')
+                assert queue.flush(timeout=5)
+
+        assert [text for _, text in telegram_api.messages] == [
+            'первое', 'второе']
+        assert telegram_api.rejected >= 1
+        assert queue.throttled == telegram_api.rejected, (
+            'Проверьте, что после RetryAfter очередь ждёт и повторяет отправку'
+        )
+
+    def test_failed_send_is_dropped_after_retries(self):
+        from delivery import OutboundQueue
+
+        bot = RecordingBot(failures=ALWAYS)
+        with OutboundQueue(bot, chat_rate=100, retries=3) as queue:
+            queue.send_message(42, 'текст')
+            assert queue.flush(timeout=5)
+        assert bot.calls == 3
+        assert queue.failed == 1
+
+    def test_enqueue_is_not_logged_as_delivery(self, caplog):
+        import homework
+        from delivery import OutboundQueue
+        from metrics import DELIVERY_FAILURES
+
+        failures = DELIVERY_FAILURES.labels('NetworkError').value
+        queue = OutboundQueue(
+            RecordingBot(failures=ALWAYS), chat_rate=100, retries=1)
+        with caplog.at_level('INFO'):
+            homework.send_message_to(queue, 42, 'текст')
+            with queue:
+                assert queue.flush(timeout=5)
+        assert 'Бот отправил сообщение' not in caplog.text, (
+            'Проверьте, что отправка логируется после доставки, '
+            'а не при постановке в очередь'
+        )
+        assert DELIVERY_FAILURES.labels('NetworkError').value == failures + 1
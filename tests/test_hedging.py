@@ -0,0 +1,87 @@
+import itertools
+import threading
+import time
+
+import pytest
+import requests
+from fake_servers import FakePracticumServer
+
+
+def first_slow(slow, fast=0.0):
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def latency():
+        with lock:
+            number = next(counter)
+        return slow if number == 0 else fast
+    return latency
+
+
+class TestHedgedTransport:
+
+    def test_hedge_wins_when_first_request_hangs(self, monkeypatch):
+        import homework
+        from hedging import HedgedTransport
+        from metrics import HEDGE_REQUESTS
+
+        fired = HEDGE_REQUESTS.labels('fired').value
+        with FakePracticumServer(latency=first_slow(2)) as practicum, \
+                HedgedTransport(requests, initial_delay=0.05,
+                                max_ratio=1) as transport:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            started = time.perf_counter()
+            response = homework.fetch_statuses(1, homework.HEADERS, transport)
+            elapsed = time.perf_counter() - started
+        assert response['homeworks'] == []
+        assert elapsed < 1, 'Проверьте, что побеждает первый ответ'
+        assert (transport.requests, transport.hedges, transport.wins) == (
+            1, 1, 1)
+        assert HEDGE_REQUESTS.labels('fired').value == fired + 1
+
+    def test_fast_requests_are_not_hedged(self):
+        from hedging import HedgedTransport
+
+        with FakePracticumServer() as practicum, \
+                HedgedTransport(requests, initial_delay=1,
+                                max_ratio=1) as transport:
+            for _ in range(5):
+                assert transport.get(practicum.endpoint).status_code == 200
+        assert transport.hedges == 0
+        assert len(practicum.requests) == 5
+
+    def test_extra_load_is_capped(self):
+        from hedging import HedgedTransport
+
+        with FakePracticumServer(latency=0.05) as practicum, \
+                HedgedTransport(requests, initial_delay=0.01,
+                                max_ratio=0.25) as transport:
+            for _ in range(12):
+                transport.get(practicum.endpoint)
+        assert transport.hedges == 3
+        assert len(practicum.requests) == 15
+
+    def test_error_from_both_requests_is_raised(self):
+        from hedging import HedgedTransport
+
+        class Broken:
+            def get(self, url, **kwargs):
+                time.sleep(0.05)
+                raise requests.ConnectionError('нет связи')
+
+        with HedgedTransport(Broken(), initial_delay=0.01,
+                             max_ratio=1) as transport:
+            with pytest.raises(requests.ConnectionError):
+                transport.get('http://example.invalid')
+        assert transport.hedges == 1
+
+    def test_delay_follows_percentile(self):
+        from hedging import HEDGE_MIN_SAMPLES, HedgedTransport
+
+        transport = HedgedTransport(requests, percentile=0.9,
+                                    initial_delay=5)
+        assert transport.delay() == 5
+        for value in range(HEDGE_MIN_SAMPLES * 5):
+            transport.window.add(value / 100)
+        assert transport.delay() == pytest.approx(0.9)
+        transport.close()
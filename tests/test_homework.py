@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from utils import StreamedResponse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('requests', 'telegram', 'urllib3', 'http.server', 'cProfile')
+
+VALID = [
+    {'homework_name': 'hw1', 'status': 'approved'},
+    {'homework_name': 123, 'status': 'reviewing'},
+    {'homework_name': 'hw {3}', 'status': 'rejected'},
+]
+INVALID = [
+    ['не словарь'],
+    [{'status': 'approved'}],
+    [{'homework_name': 'hw'}],
+    [{'homework_name': 'hw', 'status': 'unknown'}],
+    [{'homework_name': None, 'status': 'approved'}],
+]
+
+
+def error_of(func, *args):
+    with pytest.raises(Exception) as info:
+        func(*args)
+    return type(info.value), info.value.args
+
+
+class TestParseStatuses:
+
+    def test_matches_parse_status(self):
+        import homework
+
+        assert homework.parse_statuses(VALID) == [
+            homework.parse_status(item) for item in VALID]
+
+    @pytest.mark.parametrize('homeworks', INVALID)
+    def test_errors_match_parse_status(self, homeworks):
+        import homework
+
+        expected = error_of(homework.parse_status, homeworks[0])
+        assert error_of(homework.parse_statuses, VALID + homeworks) == (
+            expected), (
+            'Проверьте, что parse_statuses выбрасывает те же ошибки, '
+            'что и parse_status'
+        )
+
+    def test_logs_once_per_batch(self, caplog):
+        import homework
+
+        with caplog.at_level('INFO'):
+            homework.parse_statuses(VALID * 10)
+        assert len(caplog.records) == 1
+
+    @pytest.mark.parametrize('homeworks', INVALID)
+    def test_notify_sends_valid_prefix(self, monkeypatch, caplog, homeworks):
+        import homework
+
+        sent = []
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'send_message_to',
+                            lambda bot, chat_id, text: sent.append(text))
+        expected = error_of(homework.parse_status, homeworks[0])
+        with caplog.at_level('INFO'):
+            assert error_of(homework.notify, None, VALID + homeworks) == (
+                expected)
+        assert sent == homework.parse_statuses(VALID), (
+            'Проверьте, что работы перед ошибочной всё равно отправляются'
+        )
+        assert len(homework.OLD_STATUSES) == len(VALID)
+        assert [record.message for record in caplog.records].count(
+            'Новые статусы работ: 3') == 1
+
+    def test_notify_sends_while_streaming(self, monkeypatch):
+        import homework
+
+        response = StreamedResponse(VALID, 1000)
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(
+            homework, 'send_message_to',
+            lambda bot, chat_id, text: response.events.append('send'))
+        homework.notify(None, response['homeworks'])
+        assert response.events == ['homework', 'send'] * 3, (
+            'Проверьте, что отправка начинается до конца ответа'
+        )
+
+
+def loaded_heavy_modules(code, env=None):
+    check = (f'import sys\n{code}\n'
+             f'print([name for name in {HEAVY!r} if name in sys.modules])')
+    result = subprocess.run([sys.executable, '-c', check], cwd=ROOT,
+                            env=env, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.strip()
+
+
+class TestStartup:
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        assert loaded_heavy_modules('import homework') == '[]', (
+            'Проверьте, что requests и telegram импортируются лениво'
+        )
+
+    def test_missing_tokens_fail_before_heavy_imports(self):
+        env = {key: value for key, value in os.environ.items()
+               if key not in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN',
+                              'TELEGRAM_CHAT_ID')}
+        code = ('import homework\n'
+                'try:\n'
+                '    homework.main()\n'
+                'except Exception:\n'
+                '    pass')
+        assert loaded_heavy_modules(code, env) == '[]'
@@ -0,0 +1,82 @@
+import logging
+import time
+
+import requests
+from utils import FakeClock
+
+from liveness import Watchdog, start_health_server
+
+
+class TestWatchdog:
+
+    def test_stall_dumps_stacks_once(self, caplog):
+        clock = FakeClock()
+        aborted = []
+        watchdog = Watchdog(abort_after=60, clock=clock,
+                            abort=lambda: aborted.append(clock.now))
+        with watchdog.stage('poll', 10):
+            clock.now = 5
+            assert watchdog.check()
+            assert watchdog.lag() == 0
+            clock.now = 15
+            with caplog.at_level(logging.CRITICAL):
+                assert not watchdog.check()
+                assert not watchdog.check()
+            assert watchdog.lag() == 5
+            assert watchdog.stalls == 1
+            clock.now = 70
+            assert not watchdog.check()
+        assert watchdog.lag() == 0
+        assert watchdog.check()
+
+        dumps = [record for record in caplog.records
+                 if 'стеки потоков' in record.getMessage()]
+        assert len(dumps) == 1
+        assert 'test_stall_dumps_stacks_once' in dumps[0].getMessage()
+        assert 'Поток MainThread' in dumps[0].getMessage()
+        assert aborted == [70]
+
+    def test_background_thread_detects_stall(self, caplog):
+        with caplog.at_level(logging.CRITICAL), \
+                Watchdog(interval=0.01) as watchdog:
+            with watchdog.stage('sleep', 0.02):
+                time.sleep(0.2)
+        assert watchdog.stalls == 1
+        assert 'Стадия sleep просрочена' in caplog.text
+
+    def test_health_endpoint(self):
+        clock = FakeClock()
+        watchdog = Watchdog(clock=clock)
+        server = start_health_server(watchdog, port=0)
+        try:
+            host, port = server.server_address
+            url = f'http://{host}:{port}'
+            watchdog.beat()
+            watchdog.enter('poll', 30)
+            clock.now = 10
+            healthy = requests.get(f'{url}/health')
+            clock.now = 45
+            stalled = requests.get(f'{url}/health')
+            missing = requests.get(f'{url}/other')
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert healthy.status_code == 200
+        assert healthy.json() == {
+            'status': 'ok', 'stage': 'poll', 'lag': 0.0,
+            'since_last_cycle': 10.0, 'cycles': 1, 'stalls': 0}
+        assert stalled.status_code == 503
+        assert stalled.json()['lag'] == 15.0
+        assert missing.status_code == 404
+
+    def test_stage_is_cheap(self):
+        watchdog = Watchdog()
+        started = time.perf_counter()
+        for _ in range(100000):
+            with watchdog.stage('poll', 10):
+                pass
+            watchdog.beat()
+        per_cycle = (time.perf_counter() - started) / 100000
+        assert per_cycle < 20e-6, (
+            'Проверьте, что сторож не тормозит главный цикл'
+        )
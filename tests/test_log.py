@@ -0,0 +1,140 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+class SlowHandler(logging.Handler):
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.threads.add(threading.current_thread().name)
+        self.messages.append(self.format(record))
+
+
+class Lazy:
+
+    def __init__(self):
+        self.formatted_in = []
+
+    def __str__(self):
+        self.formatted_in.append(threading.current_thread())
+        return 'lazy'
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    root.handlers, root.level = handlers, level
+
+
+class TestLogging:
+
+    def test_caller_does_not_wait_for_handler(self, root_logger):
+        from log import setup_logging
+
+        handler = SlowHandler(delay=0.05)
+        listener = setup_logging(handler=handler)
+        started = time.perf_counter()
+        for number in range(10):
+            logging.info('Сообщение %s', number)
+        elapsed = time.perf_counter() - started
+        listener.stop()
+        assert elapsed < 0.05, (
+            'Проверьте, что запись в лог не ждёт обработчика'
+        )
+        assert handler.messages == [f'Сообщение {n}' for n in range(10)]
+        assert threading.current_thread().name not in handler.threads
+
+    def test_formatting_happens_in_background(self, root_logger):
+        from log import setup_logging
+
+        lazy = Lazy()
+        listener = setup_logging(handler=SlowHandler(delay=0))
+        logging.info('Значение: %s', lazy)
+        logging.debug('Отфильтровано: %s', lazy)
+        listener.stop()
+        assert len(lazy.formatted_in) == 1
+        assert lazy.formatted_in[0] is not threading.current_thread()
+
+    def test_sampling_keeps_warnings(self, root_logger):
+        from log import setup_logging
+
+        handler = SlowHandler(delay=0)
+        listener = setup_logging(handler=handler, sample_every=3)
+        for number in range(6):
+            logging.info('Статус %s', number)
+            logging.error('Ошибка %s', number)
+        logging.info('Редкое сообщение')
+        listener.stop()
+        assert [m for m in handler.messages if m.startswith('Статус')] == [
+            'Статус 0', 'Статус 3']
+        assert len([m for m in handler.messages
+                    if m.startswith('Ошибка')]) == 6
+        assert 'Редкое сообщение' in handler.messages
+
+    def test_sampling_counts_are_bounded(self):
+        from log import SamplingFilter
+
+        sampler = SamplingFilter(every=2, templates=10)
+
+        def record(template):
+            return logging.LogRecord(
+                'root', logging.INFO, __file__, 0, template, (), None)
+
+        for number in range(100):
+            sampler.filter(record(f'Шаблон {number}'))
+        assert len(sampler.counts) == 10, (
+            'Проверьте, что счётчики хранятся только для последних шаблонов'
+        )
+
+        def sample():
+            return sum(sampler.filter(record('Частое')) for _ in range(1000))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            passed = sum(executor.map(lambda _: sample(), range(4)))
+        assert passed == 2000
+
+    def test_full_queue_drops_records(self, root_logger):
+        from log import NonBlockingQueueHandler, setup_logging
+
+        handler = SlowHandler(delay=0.05)
+        listener = setup_logging(handler=handler, queue_size=2)
+        for number in range(20):
+            logging.info('Сообщение %s', number)
+        listener.stop()
+        queue_handler, = root_logger.handlers
+        assert isinstance(queue_handler, NonBlockingQueueHandler)
+        assert queue_handler.dropped > 0
+        assert len(handler.messages) + queue_handler.dropped == 20
+
+    def test_rotating_json_file(self, root_logger, tmp_path):
+        from log import build_handler, setup_logging
+
+        path = tmp_path / 'main.log'
+        handler = build_handler(str(path), json_format=True,
+                                max_bytes=500, backup_count=2)
+        listener = setup_logging(handler=handler)
+        for number in range(30):
+            logging.info('Бот отправил сообщение: %s', number)
+        listener.stop()
+        handler.close()
+        files = sorted(tmp_path.iterdir())
+        assert [file.name for file in files] == [
+            'main.log', 'main.log.1', 'main.log.2']
+        for file in files:
+            assert file.stat().st_size <= 500
+        last = json.loads(path.read_text(encoding='utf-8').splitlines()[-1])
+        assert last['level'] == 'INFO'
+        assert last['message'] == 'Бот отправил сообщение: 29'
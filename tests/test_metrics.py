@@ -0,0 +1,76 @@
+import time
+
+import requests
+from fake_servers import FakePracticumServer
+
+
+class TestMetrics:
+
+    def test_render_prometheus_text(self):
+        from metrics import Counter, Gauge, Histogram, Registry
+
+        registry = Registry()
+        responses = Counter('api_total', 'Ответы API.', ['code'],
+                            registry=registry)
+        depth = Gauge('depth', 'Глубина очереди.', registry=registry)
+        latency = Histogram('poll_seconds', 'Опрос.', buckets=(0.1, 1),
+                            registry=registry)
+        responses.labels(200).inc()
+        responses.labels(200).inc()
+        responses.labels(500).inc()
+        depth.set_function(lambda: 7)
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        text = registry.render()
+        assert '# TYPE api_total counter' in text
+        assert 'api_total{code="200"} 2' in text
+        assert 'api_total{code="500"} 1' in text
+        assert 'depth 7' in text
+        assert 'poll_seconds_bucket{le="0.1"} 1' in text
+        assert 'poll_seconds_bucket{le="1"} 2' in text
+        assert 'poll_seconds_bucket{le="+Inf"} 3' in text
+        assert 'poll_seconds_count 3' in text
+        assert 'poll_seconds_sum 5.55' in text
+
+    def test_metrics_endpoint(self):
+        from metrics import Counter, Registry, start_metrics_server
+
+        registry = Registry()
+        Counter('events_total', 'События.', registry=registry).inc(3)
+        server = start_metrics_server(0, registry=registry)
+        try:
+            host, port = server.server_address
+            response = requests.get(f'http://{host}:{port}/metrics')
+            missing = requests.get(f'http://{host}:{port}/other')
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert response.status_code == 200
+        assert 'events_total 3' in response.text
+        assert missing.status_code == 404
+
+    def test_get_api_answer_is_instrumented(self, monkeypatch):
+        import homework
+        from metrics import API_RESPONSES, POLL_LATENCY
+
+        ok = API_RESPONSES.labels(200)
+        before_ok, before_polls = ok.value, POLL_LATENCY.labels().count
+        with FakePracticumServer() as practicum:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            homework.get_api_answer(1)
+        assert ok.value == before_ok + 1
+        assert POLL_LATENCY.labels().count == before_polls + 1
+
+    def test_recording_is_cheap(self):
+        from metrics import Histogram, Registry
+
+        histogram = Histogram('cheap_seconds', 'Замер.', registry=Registry())
+        child = histogram.labels()
+        started = time.perf_counter()
+        for _ in range(100000):
+            child.observe(0.01)
+        per_call = (time.perf_counter() - started) / 100000
+        assert per_call < 20e-6, (
+            'Проверьте, что запись метрики не тормозит горячий путь'
+        )
@@ -0,0 +1,172 @@
+import time
+
+import telegram
+from fake_servers import FakeTelegramServer
+from utils import ALWAYS, RecordingBot
+
+from delivery import OutboundQueue
+from outbox import Outbox
+
+
+class TestOutbox:
+
+    def test_unsent_messages_survive_reopen(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        with Outbox(path) as outbox:
+            outbox.add(1, 'первое')
+            outbox.add(2, 'второе')
+            with open(path) as file:
+                assert file.read() == ''
+            outbox.commit()
+            assert outbox.commits == 1
+            outbox.ack(1, ['первое'])
+
+        with Outbox(path) as outbox:
+            assert outbox.unsent() == [(2, 'второе')]
+            assert outbox.add(3, 'третье') == 3
+
+    def test_torn_record_is_skipped(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        with Outbox(path) as outbox:
+            outbox.add(1, 'целое')
+        with open(path, 'a') as file:
+            file.write('{"id": 2, "chat_id": 1, "te')
+        assert Outbox(path).unsent() == [(1, 'целое')]
+
+    def test_compaction_keeps_unsent(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        with Outbox(path, compact_every=10) as outbox:
+            for number in range(20):
+                outbox.add(1, f'сообщение {number}')
+            outbox.add(2, 'ждёт')
+            outbox.commit()
+            for number in range(20):
+                outbox.ack(1, [f'сообщение {number}'])
+        with open(path) as file:
+            assert len(file.readlines()) < 10
+        assert Outbox(path).unsent() == [(2, 'ждёт')]
+
+    def test_duplicate_texts_are_acked_once_each(self, tmp_path):
+        with Outbox(str(tmp_path / 'outbox.jsonl')) as outbox:
+            for _ in range(3):
+                outbox.add(1, 'одинаковое')
+            outbox.ack(1, ['одинаковое', 'одинаковое'])
+            assert outbox.unsent() == [(1, 'одинаковое')]
+
+
+class TestDurableDelivery:
+
+    def test_messages_are_resent_after_restart(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        with OutboundQueue(RecordingBot(failures=ALWAYS), retries=1,
+                           outbox=Outbox(path)) as queue:
+            queue.send_message('1', 'вердикт')
+            queue.broadcast(['2', '3'], 'другой вердикт')
+            assert queue.flush(timeout=5)
+        assert queue.failed == 3
+
+        with FakeTelegramServer() as telegram_api:
+            bot = telegram.Bot('1234:abcdefg',
+                               base_url=telegram_api.base_url)
+            outbox = Outbox(path)
+            assert len(outbox.unsent()) == 3
+            with OutboundQueue(bot, global_rate=100, outbox=outbox) as queue:
+                assert queue.flush(timeout=5)
+
+        assert sorted(telegram_api.messages) == [
+            ('1', 'вердикт'), ('2', 'другой вердикт'),
+            ('3', 'другой вердикт')]
+        assert Outbox(path).unsent() == []
+
+    def test_failed_messages_are_retried_later(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        bot = RecordingBot(failures=2)
+        with OutboundQueue(bot, retries=2, retry_delay=0.1,
+                           outbox=Outbox(path)) as queue:
+            queue.send_message('1', 'вердикт')
+            assert queue.flush(timeout=5)
+            assert bot.messages == []
+            assert queue.deferred_depth() == 1
+            deadline = time.monotonic() + 5
+            while not bot.messages and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert queue.flush(timeout=5)
+
+        assert bot.messages == [('1', 'вердикт')]
+        assert queue.deferred_depth() == 0
+        assert Outbox(path).unsent() == []
+
+    def test_group_commit(self, tmp_path):
+        outbox = Outbox(str(tmp_path / 'outbox.jsonl'))
+        with FakeTelegramServer(blocked_chats=['13']) as telegram_api:
+            bot = telegram.Bot('1234:abcdefg',
+                               base_url=telegram_api.base_url)
+            queue = OutboundQueue(bot, global_rate=1000, retries=1,
+                                  outbox=outbox, commit_delay=60).start()
+            queue.broadcast([str(chat_id) for chat_id in range(20)], 'текст')
+            assert queue.depth() == 20
+            assert queue.flush(timeout=5)
+            queue.close()
+
+        assert outbox.commits == 1
+        assert len(telegram_api.messages) == 19
+        assert queue.failures.keys() == {'13'}
+        assert Outbox(outbox.path).unsent() == []
+
+    def test_poll_cycle_commits_before_saving_statuses(self, tmp_path,
+                                                       monkeypatch):
+        import homework
+        from alerts import ErrorAggregator
+        from scheduler import FixedScheduler
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '42')
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                           'status': 'approved'}],
+            'current_date': 100})
+        path = str(tmp_path / 'outbox.jsonl')
+        queue = OutboundQueue(
+            RecordingBot(failures=ALWAYS), outbox=Outbox(path))
+        with StateStore(str(tmp_path / 'state.sqlite3')) as store:
+            homework.poll_cycle(queue, store, FixedScheduler(0),
+                                ErrorAggregator(), 1)
+            assert store.load_statuses() == {'1': ('approved', None)}
+
+        assert Outbox(path).unsent() == [
+            ('42', homework.parse_status({'homework_name': 'hw1',
+                                          'status': 'approved'}))]
+
+    def test_large_batch_is_journaled_before_statuses(self, tmp_path,
+                                                      monkeypatch):
+        import homework
+        from alerts import ErrorAggregator
+        from scheduler import FixedScheduler
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '42')
+        monkeypatch.setattr(homework, 'get_api_answer', lambda ts: {
+            'homeworks': [{'id': number, 'homework_name': f'hw{number}',
+                           'status': 'approved'} for number in range(150)],
+            'current_date': 100})
+        path = str(tmp_path / 'outbox.jsonl')
+        queue = OutboundQueue(
+            RecordingBot(failures=ALWAYS), outbox=Outbox(path))
+        journaled = []
+        with StateStore(str(tmp_path / 'state.sqlite3'),
+                        batch_size=100) as store:
+            flush = store.flush
+
+            def checked_flush():
+                if store._statuses:
+                    journaled.append(len(Outbox(path).unsent()))
+                flush()
+
+            monkeypatch.setattr(store, 'flush', checked_flush)
+            homework.poll_cycle(queue, store, FixedScheduler(0),
+                                ErrorAggregator(), 1)
+            assert len(store.load_statuses()) == 150
+
+        assert journaled and set(journaled) == {150}
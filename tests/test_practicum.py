@@ -0,0 +1,65 @@
+import pytest
+import requests
+from fake_servers import FakePracticumServer
+
+
+class TestPracticumClient:
+
+    def test_keep_alive_reuses_connection(self, monkeypatch):
+        import homework
+        from practicum import PracticumClient
+
+        with FakePracticumServer() as server, PracticumClient() as client:
+            monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+            monkeypatch.setattr(homework, 'api_client', client)
+            for timestamp in range(1, 6):
+                homework.get_api_answer(timestamp)
+        assert len(server.requests) == 5
+        assert server.connections == 1, (
+            'Проверьте, что клиент переиспользует соединение из пула'
+        )
+
+    def test_gzip_negotiation(self, monkeypatch):
+        import homework
+        from practicum import PracticumClient
+
+        homeworks = [{'homework_name': 'hw', 'status': 'approved'}]
+        with FakePracticumServer(homeworks=homeworks) as server, \
+                PracticumClient() as client:
+            monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+            monkeypatch.setattr(homework, 'api_client', client)
+            response = homework.get_api_answer(1)
+        assert response['homeworks'] == homeworks
+        headers = server.requests[0]['headers']
+        assert 'gzip' in headers['Accept-Encoding']
+        assert server.requests[0]['params'] == {'from_date': '1'}
+
+    def test_client_timeout_reaches_request(self, monkeypatch):
+        import homework
+        from practicum import PracticumClient
+
+        with FakePracticumServer() as server, \
+                PracticumClient(connect_timeout=1, read_timeout=2) as client:
+            monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+            monkeypatch.setattr(homework, 'api_client', client)
+            timeouts = []
+            get = client.session.get
+
+            def spy(url, **kwargs):
+                timeouts.append(kwargs.get('timeout'))
+                return get(url, **kwargs)
+
+            monkeypatch.setattr(client.session, 'get', spy)
+            homework.get_api_answer(1)
+        assert timeouts == [(1, 2)]
+
+    def test_read_timeout_is_enforced(self, monkeypatch):
+        import homework
+        from practicum import PracticumClient
+
+        with FakePracticumServer(latency=0.5) as server, \
+                PracticumClient(read_timeout=0.05) as client:
+            monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+            monkeypatch.setattr(homework, 'api_client', client)
+            with pytest.raises(requests.Timeout):
+                homework.get_api_answer(1)
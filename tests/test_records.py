@@ -0,0 +1,71 @@
+import json
+import pickle
+import sys
+
+import pytest
+from utils import RecordingBot
+
+DATA = {'id': 7, 'homework_name': 'hw', 'status': 'approved',
+        'date_updated': '2022-02-13T14:40:57Z',
+        'reviewer_comment': 'Отлично', 'lesson_name': 'Проект'}
+
+
+class TestHomework:
+
+    def test_from_dict_keeps_needed_fields(self):
+        from records import Homework
+
+        record = Homework.from_dict(DATA)
+        assert (record.id, record.name, record.status,
+                record.date_updated) == (
+            7, 'hw', 'approved', '2022-02-13T14:40:57Z')
+        assert record == Homework(7, 'hw', 'approved', DATA['date_updated'])
+        assert record.get('homework_name') == 'hw'
+        assert record.get('reviewer_comment', 'нет') == 'нет'
+        assert sys.getsizeof(record) < sys.getsizeof(DATA)
+
+    def test_is_immutable(self):
+        from records import Homework
+
+        record = Homework.from_dict(DATA)
+        with pytest.raises(AttributeError):
+            record.status = 'rejected'
+        with pytest.raises(AttributeError):
+            record.extra = 1
+        assert pickle.loads(pickle.dumps(record)) == record
+
+    def test_status_is_interned(self):
+        from records import Homework
+
+        first, second = (Homework.from_dict(item) for item in json.loads(
+            json.dumps([DATA, DATA])))
+        assert first.status is second.status
+
+    @pytest.mark.parametrize('data, error', [
+        ('не словарь', TypeError),
+        ({'status': 'approved'}, KeyError),
+        ({'homework_name': 'hw'}, KeyError),
+    ])
+    def test_errors_match_parse_status(self, data, error):
+        import homework
+        from records import Homework
+
+        with pytest.raises(error) as expected:
+            homework.parse_status(data)
+        with pytest.raises(error) as actual:
+            Homework.from_dict(data)
+        assert actual.value.args == expected.value.args
+
+    def test_pipeline_stores_records(self, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        bot = RecordingBot()
+        homeworks = json.loads(json.dumps([DATA, dict(DATA, id=8)]))
+        changes = homework.notify(bot, homeworks)
+        assert [type(change).__name__ for change in changes] == [
+            'Homework', 'Homework']
+        assert bot.texts == [homework.parse_status(DATA)] * 2
+        statuses = [status for status, _ in homework.OLD_STATUSES.values()]
+        assert statuses[0] is statuses[1]
+        assert homework.notify(bot, homeworks) == []
@@ -0,0 +1,170 @@
+import json
+
+import pytest
+import requests
+
+from fake_servers import FakePracticumServer
+
+STATUSES = ['reviewing', 'reviewing', 'rejected', 'approved']
+
+
+def live_run(server, path, cycles=len(STATUSES)):
+    """Опрос заглушки с записью трафика; сообщения бота."""
+    import homework
+    from alerts import ErrorAggregator
+    from practicum import PracticumClient
+    from replay import NullBot, Recorder
+    from scheduler import FixedScheduler
+    from state import StateStore
+
+    bot = NullBot()
+    store = StateStore(':memory:')
+    scheduler = FixedScheduler(0)
+    alerts = ErrorAggregator()
+    cursor = 1000
+    with Recorder(PracticumClient(), path) as recorder:
+        homework.api_client = recorder
+        for cycle in range(cycles):
+            server.current_date = 2000 + cycle
+            cursor = homework.poll_cycle(bot, store, scheduler, alerts, cursor)
+    homework.api_client = None
+    store.close()
+    return bot.messages
+
+
+@pytest.fixture
+def server(monkeypatch):
+    import homework
+
+    calls = []
+
+    def homeworks(authorization, params):
+        calls.append(params)
+        status = STATUSES[min(len(calls), len(STATUSES)) - 1]
+        return [{'id': 1, 'homework_name': 'hw1', 'status': status,
+                 'date_updated': '2022-01-01T00:00:00Z'}]
+
+    with FakePracticumServer(homeworks=homeworks) as server:
+        monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+        monkeypatch.setattr(homework, 'HEADERS', {'Authorization': 'secret'})
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 42)
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'api_client', None)
+        yield server
+
+
+class TestRecorder:
+
+    def test_captures_requests_and_responses(self, server, tmp_path):
+        import homework
+        from replay import load_captures
+
+        path = str(tmp_path / 'captures.jsonl')
+        live_run(server, path)
+
+        captures = load_captures(path)
+        assert len(captures) == len(STATUSES)
+        first = captures[0]
+        assert first['url'] == server.endpoint
+        assert first['params'] == {'from_date': 1000 - homework.CURSOR_OVERLAP}
+        assert first['status'] == 200
+        assert json.loads(first['body'])['current_date'] == 2000
+        assert first['elapsed'] > 0
+        with open(path) as file:
+            assert 'secret' not in file.read()
+
+    def test_captures_errors(self, tmp_path):
+        from replay import Recorder, ReplayTransport, load_captures
+
+        class Unreachable:
+            def get(self, url, **kwargs):
+                raise requests.ConnectionError('нет соединения')
+
+        path = str(tmp_path / 'captures.jsonl')
+        with Recorder(Unreachable(), path) as recorder:
+            with pytest.raises(requests.ConnectionError):
+                recorder.get('http://example.com', params={'from_date': 1})
+        capture, = load_captures(path)
+        assert capture['error'] == 'ConnectionError'
+
+        transport = ReplayTransport([capture])
+        with pytest.raises(requests.ConnectionError, match='нет соединения'):
+            transport.get('http://example.com', params={'from_date': 1})
+        with pytest.raises(EOFError):
+            transport.get('http://example.com')
+
+
+class TestReplay:
+
+    def test_replay_reproduces_live_run(self, server, tmp_path,
+                                        monkeypatch):
+        import homework
+        from replay import NullBot, load_captures, replay
+
+        path = str(tmp_path / 'captures.jsonl')
+        live = live_run(server, path)
+        requests_sent = len(server.requests)
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+
+        bot = NullBot()
+        summary = replay(load_captures(path), bot)
+
+        assert bot.messages == live
+        assert len(live) == 3
+        assert summary['requests'] == len(STATUSES)
+        assert summary['mismatches'] == 0
+        assert summary['cursor'] == 2000 + len(STATUSES) - 1
+        assert len(server.requests) == requests_sent
+        assert homework.api_client is None
+
+    def test_recorded_speed(self, monkeypatch):
+        import homework
+        from replay import NullBot, replay
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        body = json.dumps({'homeworks': [], 'current_date': 1})
+        captures = [
+            {'time': 100.0, 'url': homework.ENDPOINT, 'params': {},
+             'status': 200, 'body': body, 'elapsed': 0.5},
+            {'time': 110.0, 'url': homework.ENDPOINT, 'params': {},
+             'status': 500, 'body': body, 'elapsed': 1.0},
+        ]
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        summary = replay(captures, NullBot(), speed=2, sleep=sleep,
+                         clock=lambda: now[0])
+        assert sleeps == [0.0, 0.25, 4.75, 0.5]
+        assert summary['seconds'] == 5.5
+        assert summary['errors'] == 1
+
+    def test_server_error_storm_then_recovery(self, monkeypatch):
+        import homework
+        from replay import NullBot, replay
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        breaker = homework.PRACTICUM_BREAKER
+        failed = json.dumps({'code': 'unavailable'})
+        ok = json.dumps({'current_date': 100, 'homeworks': [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}]})
+        captures = [
+            {'time': 0.0, 'url': homework.ENDPOINT, 'params': {},
+             'status': 503, 'body': failed, 'elapsed': 0.1}] * 6 + [
+            {'time': 0.0, 'url': homework.ENDPOINT, 'params': {},
+             'status': 200, 'body': ok, 'elapsed': 0.1}] * 3
+
+        bot = NullBot()
+        summary = replay(captures, bot)
+
+        assert summary['requests'] == 9
+        assert summary['errors'] == 6
+        assert [text for _, text in bot.messages if 'hw1' in text] == [
+            homework.parse_status({'homework_name': 'hw1',
+                                   'status': 'approved'})]
+        assert homework.PRACTICUM_BREAKER is breaker
+        assert breaker.state == 'closed'
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+
+class TestAdaptiveScheduler:
+
+    def test_fixed_matches_retry_time(self):
+        from scheduler import FixedScheduler
+
+        scheduler = FixedScheduler(5)
+        scheduler.record([])
+        assert scheduler.next_delay() == 5
+        assert scheduler.polls_avoided == 0
+
+    def test_idle_interval_grows_to_limit(self):
+        from scheduler import AdaptiveScheduler
+
+        scheduler = AdaptiveScheduler(5, idle_max=60)
+        delays = []
+        for _ in range(10):
+            scheduler.record([])
+            delays.append(scheduler.next_delay())
+        assert delays == sorted(delays)
+        assert delays[0] > 5
+        assert delays[-1] == 60
+        assert scheduler.polls_avoided > 0, (
+            'Проверьте, что планировщик считает пропущенные опросы'
+        )
+
+    def test_reviewing_keeps_short_interval(self):
+        from scheduler import AdaptiveScheduler
+
+        scheduler = AdaptiveScheduler(5, reviewing_interval=2, idle_max=60)
+        scheduler.record([{'id': 1, 'status': 'reviewing'}])
+        for _ in range(5):
+            scheduler.record([])
+            assert scheduler.next_delay() == 2
+        scheduler.record([{'id': 1, 'status': 'approved'}])
+        scheduler.record([])
+        assert scheduler.next_delay() > 5
+
+    def test_reviewing_records(self):
+        from records import Homework
+        from scheduler import AdaptiveScheduler
+
+        scheduler = AdaptiveScheduler(5, reviewing_interval=2, idle_max=60)
+        scheduler.record([Homework(1, 'hw', 'reviewing')])
+        scheduler.record([])
+        assert scheduler.next_delay() == 2
+        scheduler.record([Homework(1, 'hw', 'approved')])
+        assert scheduler.reviewing == set()
+
+    def test_reviewing_survives_restart(self, monkeypatch, tmp_path):
+        import homework
+        from scheduler import AdaptiveScheduler
+        from state import StateStore
+
+        path = str(tmp_path / 'state.sqlite3')
+        with StateStore(path) as store:
+            store.set_status({'id': 1, 'status': 'reviewing'})
+            store.set_status({'id': 2, 'status': 'approved'})
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        with StateStore(path) as store:
+            homework.OLD_STATUSES.update(store.load_statuses())
+        scheduler = AdaptiveScheduler(5, reviewing_interval=2, idle_max=60)
+        scheduler.seed(homework.OLD_STATUSES)
+        scheduler.record([])
+        assert scheduler.next_delay() == 2, (
+            'Проверьте, что работы на проверке восстанавливаются из store'
+        )
+
+    def test_pushes_are_observed(self, monkeypatch, tmp_path):
+        import homework
+        from alerts import ErrorAggregator
+        from scheduler import AdaptiveScheduler
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'send_message_to',
+                            lambda bot, chat_id, text: None)
+        scheduler = AdaptiveScheduler(5, reviewing_interval=2, idle_max=60)
+        with StateStore(str(tmp_path / 'state.sqlite3')) as store:
+            homework.push_cycle(
+                None, store, scheduler, ErrorAggregator(),
+                [{'id': 1, 'homework_name': 'hw', 'status': 'reviewing'}])
+        assert scheduler.reviewing == {'1'}
+        assert scheduler.polls == 0, (
+            'Проверьте, что push не считается опросом'
+        )
+
+    def test_errors_back_off_with_jitter(self):
+        from scheduler import AdaptiveScheduler
+
+        scheduler = AdaptiveScheduler(5, error_max=40,
+                                      rng=random.Random(1))
+        ceilings = []
+        for _ in range(6):
+            scheduler.record_error(Exception('сбой'))
+            delay = scheduler.next_delay()
+            ceiling = min(40, 5 * 2 ** scheduler.failures)
+            assert ceiling / 2 <= delay <= ceiling
+            ceilings.append(ceiling)
+        assert ceilings[-1] == 40
+        scheduler.record([{'id': 1, 'status': 'approved'}])
+        assert scheduler.next_delay() == 5
+
+    def test_create_scheduler_unknown(self):
+        from scheduler import create_scheduler
+
+        with pytest.raises(KeyError):
+            create_scheduler(5, 'cron')
@@ -0,0 +1,126 @@
+import time
+
+import telegram
+from fake_servers import FakePracticumServer, FakeTelegramServer
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Условие не выполнилось вовремя'
+        time.sleep(0.02)
+
+
+class TestHashRing:
+
+    def test_keys_are_spread_evenly(self):
+        from shards import HashRing
+
+        ring = HashRing(['a', 'b', 'c', 'd'])
+        plan = ring.assign(f'student{i}' for i in range(4000))
+        assert sorted(plan) == ['a', 'b', 'c', 'd']
+        assert all(600 < len(keys) < 1400 for keys in plan.values())
+
+    def test_adding_node_moves_only_its_keys(self):
+        from shards import HashRing
+
+        keys = [f'student{i}' for i in range(2000)]
+        ring = HashRing(['a', 'b', 'c'])
+        before = {key: ring.node_for(key) for key in keys}
+        ring.add('d')
+        after = {key: ring.node_for(key) for key in keys}
+        moved = [key for key in keys if before[key] != after[key]]
+        assert all(after[key] == 'd' for key in moved)
+        assert len(moved) < len(keys) / 2
+
+        ring.remove('d')
+        assert {key: ring.node_for(key) for key in keys} == before
+        assert len(ring) == 3
+
+
+class TestShardWorker:
+
+    def test_assign_loads_only_own_tenants(self, monkeypatch, tmp_path):
+        import homework
+        from shards import ShardWorker
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'SCOPED_STATUSES', {})
+        with StateStore(str(tmp_path / 'state.sqlite3')) as store:
+            for name in ('a', 'ab', 'b'):
+                store.set_status({'id': 1, 'status': 'approved'}, name)
+            worker = ShardWorker('shard0', None, None, store, concurrency=1)
+            try:
+                worker.assign([{'name': 'a', 'token': 't', 'chat_id': 1}])
+                assert homework.SCOPED_STATUSES == {
+                    'a': {'a/1': ('approved', None)}}, (
+                    'Проверьте, что шард загружает только своих арендаторов'
+                )
+                tenant = worker.poller.registry.get('a')
+                tenant.cursor = 500
+                worker.assign([{'name': 'a', 'token': 't', 'chat_id': 1},
+                               {'name': 'b', 'token': 't', 'chat_id': 2}])
+                assert worker.poller.registry.get('a') is tenant
+                worker.assign([{'name': 'b', 'token': 't', 'chat_id': 2}])
+                assert list(homework.SCOPED_STATUSES) == ['b'], (
+                    'Проверьте, что отданные арендаторы выгружаются'
+                )
+            finally:
+                worker.close()
+
+
+class TestShardSupervisor:
+
+    def test_tenants_are_rebalanced_when_worker_dies(
+            self, monkeypatch, tmp_path):
+        import homework
+        from tenants import Tenant, TenantRegistry
+        from shards import ShardSupervisor
+
+        date_updated = time.strftime(homework.DATE_FORMAT, time.gmtime())
+
+        def homeworks(authorization, params):
+            return [{'id': authorization, 'homework_name': 'hw',
+                     'status': 'approved', 'date_updated': date_updated}]
+
+        monkeypatch.setattr(homework, 'SCOPED_STATUSES', {})
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+        registry = TenantRegistry(
+            Tenant(f'student{i}', f'token{i}', 100 + i) for i in range(12))
+        with FakePracticumServer(homeworks=homeworks) as practicum, \
+                FakeTelegramServer() as telegram_api:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            monkeypatch.setattr(
+                telegram, 'Bot', lambda token: telegram.bot.Bot(
+                    token, base_url=telegram_api.base_url))
+            with ShardSupervisor(registry, size=3, retry_time=0.05,
+                                 concurrency=2,
+                                 state_path=str(tmp_path / 'state.sqlite3'),
+                                 ) as supervisor:
+                wait_for(lambda: len(telegram_api.messages) >= 12)
+                assigned = set().union(*supervisor.assignment.values())
+                assert assigned == {tenant.name for tenant in registry}
+
+                victim = max(supervisor.assignment,
+                             key=lambda name: len(supervisor.assignment[name]))
+                orphans = supervisor.assignment[victim]
+                process, _ = supervisor.workers[victim]
+                process.kill()
+                process.join()
+                supervisor.supervise()
+
+                assert victim not in supervisor.workers
+                assert len(supervisor.workers) == 3
+                assert set().union(*supervisor.assignment.values()) == (
+                    assigned)
+                seen = len(practicum.requests)
+                wait_for(lambda: {
+                    request['headers']['Authorization']
+                    for request in practicum.requests[seen:]
+                } >= {f'OAuth {registry.get(name).token}'
+                      for name in orphans})
+
+        assert sorted(chat for chat, _ in telegram_api.messages) == sorted(
+            str(100 + i) for i in range(12)), (
+            'Проверьте, что после переезда шарда сообщения не дублируются'
+        )
@@ -0,0 +1,182 @@
+import sqlite3
+
+import pytest
+import telegram
+from fake_servers import FakePracticumServer, FakeTelegramServer
+from utils import RecordingBot
+
+
+class StopLoop(BaseException):
+    pass
+
+
+def run_main_once(monkeypatch, practicum, telegram_api):
+    import homework
+
+    def stop(delay):
+        raise StopLoop
+
+    monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 42)
+    monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+    monkeypatch.setattr(homework, 'subscriptions', None)
+    monkeypatch.setattr(homework.time, 'sleep', stop)
+    monkeypatch.setattr(
+        telegram, 'Bot',
+        lambda token, **kwargs: telegram.bot.Bot(
+            token, base_url=telegram_api.base_url, **kwargs))
+    with pytest.raises(StopLoop):
+        homework.main()
+    return homework
+
+
+class TestStateStore:
+
+    def test_cursor_survives_reopen(self, tmp_path):
+        from state import StateStore
+
+        path = str(tmp_path / 'state.sqlite3')
+        with StateStore(path) as store:
+            assert store.get_cursor() == 1
+            store.set_cursor(1000)
+            store.set_cursor(2000, name='student')
+        with StateStore(path) as store:
+            assert store.get_cursor() == 1000
+            assert store.get_cursor('student') == 2000
+
+    def test_writes_are_batched(self, tmp_path):
+        from state import StateStore
+
+        path = str(tmp_path / 'state.sqlite3')
+        store = StateStore(path, batch_size=3)
+        reader = sqlite3.connect(path)
+        store.set_cursor(10)
+        store.set_status({'id': 1, 'status': 'reviewing'})
+        assert reader.execute('SELECT COUNT(*) FROM statuses').fetchone() == (
+            0,)
+        store.set_status({'id': 2, 'status': 'approved'})
+        assert reader.execute('SELECT COUNT(*) FROM statuses').fetchone() == (
+            2,)
+        assert store.load_statuses() == {
+            '1': ('reviewing', None), '2': ('approved', None)}
+        mode = store.connection.execute('PRAGMA journal_mode').fetchone()
+        assert mode == ('wal',)
+        store.close()
+
+    def test_restart_resumes_from_cursor(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        homeworks = [{'id': 7, 'homework_name': 'hw',
+                      'status': 'approved', 'date_updated': '2022-01-01'}]
+        with FakePracticumServer(homeworks=homeworks,
+                                 current_date=5000) as practicum, \
+                FakeTelegramServer() as telegram_api:
+            run_main_once(monkeypatch, practicum, telegram_api)
+            homework = run_main_once(monkeypatch, practicum, telegram_api)
+
+        dates = [request['params']['from_date']
+                 for request in practicum.requests]
+        assert dates == ['1', str(5000 - homework.CURSOR_OVERLAP)], (
+            'Проверьте, что после перезапуска опрос продолжается '
+            'с сохранённого курсора'
+        )
+        assert homework.OLD_STATUSES == {'7': ('approved', '2022-01-01')}
+        assert len(telegram_api.messages) == 1, (
+            'Проверьте, что после перезапуска статус не отправляется повторно'
+        )
+
+
+class TestStatusDiff:
+
+    def test_repeated_statuses_are_not_resent(self, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        first = {'id': 1, 'status': 'reviewing',
+                 'date_updated': '2022-01-01T10:00:00Z'}
+        assert list(homework.diff_statuses([first])) == [first]
+        homework.remember_status(first)
+        assert list(homework.diff_statuses([dict(first)])) == []
+        approved = dict(first, status='approved',
+                        date_updated='2022-01-02T10:00:00Z')
+        assert list(homework.diff_statuses([approved])) == [approved]
+        homework.remember_status(approved)
+        assert list(homework.diff_statuses([first])) == [], (
+            'Проверьте, что устаревший статус не отправляется повторно'
+        )
+
+
+class TestWatermark:
+
+    def poll(self, homework, practicum, store, cursor):
+        from alerts import ErrorAggregator
+        from scheduler import FixedScheduler
+
+        bot = RecordingBot()
+        cursor = homework.poll_cycle(bot, store, FixedScheduler(5),
+                                     ErrorAggregator(), cursor)
+        return cursor, bot.texts
+
+    def test_overlap_window_does_not_resend(self, monkeypatch, tmp_path):
+        import homework
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        item = {'id': 1, 'homework_name': 'hw', 'status': 'reviewing',
+                'date_updated': '2022-02-13T14:40:57Z'}
+        with FakePracticumServer(homeworks=[item],
+                                 current_date=10000) as practicum, \
+                StateStore(str(tmp_path / 'state.sqlite3')) as store:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            cursor, first = self.poll(homework, practicum, store, 1)
+            practicum.current_date = 9000
+            cursor, second = self.poll(homework, practicum, store, cursor)
+        dates = [request['params']['from_date']
+                 for request in practicum.requests]
+        assert dates == ['1', str(10000 - homework.CURSOR_OVERLAP)]
+        assert len(first) == 1
+        assert second == [], (
+            'Проверьте, что работы из перекрытия не отправляются повторно'
+        )
+        assert cursor == 10000, (
+            'Проверьте, что курсор не сдвигается назад'
+        )
+
+    def test_old_watermarks_are_forgotten(self, monkeypatch, tmp_path):
+        import homework
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        path = str(tmp_path / 'state.sqlite3')
+        with StateStore(path) as store:
+            for key, date in ((1, '2022-01-01T00:00:00Z'),
+                              (2, None),
+                              (3, '2022-01-02T00:00:00Z'),
+                              (4, '2022-03-01T00:00:00Z')):
+                homework.remember_status(
+                    {'id': key, 'status': 'approved', 'date_updated': date},
+                    store)
+            homework.remember_status(
+                {'id': 1, 'status': 'approved',
+                 'date_updated': '2022-04-01T00:00:00Z'}, store)
+            february = 1643673600
+            homework.forget_statuses(february, store)
+            assert list(homework.OLD_STATUSES) == ['2', '4', '1'], (
+                'Проверьте, что отметки без даты не переставляются'
+            )
+        with StateStore(path) as store:
+            assert list(store.load_statuses()) == ['4', '1', '2']
+
+    def test_undated_statuses_are_bounded(self, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'UNDATED_STATUS_LIMIT', 2)
+        for key in range(5):
+            homework.remember_status({'id': key, 'status': 'approved'})
+        homework.remember_status(
+            {'id': 5, 'status': 'approved',
+             'date_updated': '2022-03-01T00:00:00Z'})
+        homework.forget_statuses(1643673600)
+        assert list(homework.OLD_STATUSES) == ['3', '4', '5']
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from fake_servers import FakePracticumServer
+
+HOMEWORKS = [
+    {'id': number, 'homework_name': f'работа {number}',
+     'status': 'approved', 'reviewer_comment': 'Всё нравится'}
+    for number in range(50)
+]
+BODY = json.dumps(
+    {'homeworks': HOMEWORKS, 'current_date': 1234567890},
+    ensure_ascii=False).encode()
+
+
+def chunked(body, size):
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class TestHomeworkStream:
+
+    @pytest.mark.parametrize('size', [1, 7, 4096])
+    def test_items_match_full_parse(self, size):
+        from streaming import HomeworkStream
+
+        stream = HomeworkStream(chunked(BODY, size))
+        assert list(stream['homeworks']) == HOMEWORKS
+        assert stream['current_date'] == 1234567890
+
+    def test_first_item_before_body_is_read(self):
+        from streaming import HomeworkStream
+
+        chunks = chunked(BODY, 64)
+        read = []
+
+        def source():
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+
+        stream = HomeworkStream(source())
+        first = next(iter(stream['homeworks']))
+        assert first == HOMEWORKS[0]
+        assert len(read) < len(chunks) / 10, (
+            'Проверьте, что первая работа доступна до чтения всего ответа'
+        )
+
+    def test_meta_before_homeworks_buffers_items(self):
+        from streaming import HomeworkStream
+
+        stream = HomeworkStream(chunked(BODY, 100))
+        assert stream['current_date'] == 1234567890
+        assert list(stream['homeworks']) == HOMEWORKS
+
+    def test_check_response_errors(self):
+        import homework
+        from streaming import HomeworkStream
+
+        with pytest.raises(KeyError):
+            homework.check_response(HomeworkStream([b'{"current_date": 1}']))
+        with pytest.raises(TypeError):
+            homework.check_response(HomeworkStream([b'[{"homeworks": []}]']))
+        with pytest.raises(Exception):
+            homework.check_response(
+                HomeworkStream([b'{"homeworks": {"status": "approved"}}']))
+
+    def test_streaming_get_api_answer(self, monkeypatch):
+        import homework
+
+        with FakePracticumServer(homeworks=HOMEWORKS[:3],
+                                 current_date=42) as practicum:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            monkeypatch.setattr(homework, 'STREAM_RESPONSES', True)
+            response = homework.get_api_answer(1)
+            messages = [homework.parse_status(item)
+                        for item in homework.check_response(response)]
+            assert response['current_date'] == 42
+        assert messages[0] == (
+            'Изменился статус проверки работы "работа 0". '
+            'Работа проверена: ревьюеру всё понравилось. Ура!'
+        )
+        assert len(messages) == 3
@@ -0,0 +1,88 @@
+import json
+
+from fake_servers import FakeTelegramServer
+
+
+class TestSubscriptions:
+
+    def test_chats_for_homework(self):
+        from records import Homework
+        from subscriptions import Subscriptions
+
+        subscriptions = Subscriptions(
+            chats=[1, '1', 2], homeworks={'hw1': [3, 2], 'hw2': []})
+        assert subscriptions.chats == ['1', '2']
+        assert subscriptions.chats_for(
+            Homework(1, 'hw1', 'approved')) == ['1', '2', '3']
+        assert subscriptions.chats_for({'homework_name': 'hw2'}) == [
+            '1', '2']
+        assert len(subscriptions) == 3
+
+    def test_subscribe_and_unsubscribe(self):
+        from subscriptions import Subscriptions
+
+        subscriptions = Subscriptions()
+        subscriptions.subscribe(42, 'hw1')
+        subscriptions.subscribe('42', 'hw1')
+        subscriptions.subscribe(7)
+        assert subscriptions.chats_for({'homework_name': 'hw1'}) == [
+            '7', '42']
+        subscriptions.unsubscribe(42, 'hw1')
+        subscriptions.unsubscribe(8)
+        assert subscriptions.chats_for({'homework_name': 'hw1'}) == ['7']
+
+    def test_load_and_save(self, tmp_path):
+        from subscriptions import Subscriptions
+
+        path = str(tmp_path / 'subscriptions.json')
+        assert Subscriptions.load(path, chats=[42]).chats == ['42']
+        with open(path, 'w') as file:
+            json.dump({'chats': [1], 'homeworks': {'hw1': [2]}}, file)
+        subscriptions = Subscriptions.load(path, chats=[42])
+        subscriptions.subscribe(3, 'hw2')
+        subscriptions.save(path)
+
+        loaded = Subscriptions.load(path)
+        assert loaded.chats == ['42', '1']
+        assert loaded.homeworks == {'hw1': ['2'], 'hw2': ['3']}
+
+
+class TestFanOut:
+
+    def test_verdict_reaches_every_subscriber(self, monkeypatch):
+        import homework
+        from delivery import OutboundQueue, pooled_bot
+        from subscriptions import Subscriptions
+
+        chats = [str(chat_id) for chat_id in range(100, 150)]
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        monkeypatch.setattr(homework, 'subscriptions', Subscriptions(
+            chats=chats[:1], homeworks={'hw1': chats}))
+        with FakeTelegramServer(latency=0.01) as telegram_api:
+            bot = pooled_bot('1234:abcdefg', pool_size=8,
+                             base_url=telegram_api.base_url)
+            with OutboundQueue(bot, global_rate=1000, workers=8) as queue:
+                homework.notify(queue, [
+                    {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                ])
+                assert queue.flush(timeout=10)
+
+        assert sorted(chat for chat, _ in telegram_api.messages) == chats
+        assert queue.sent == len(chats)
+        assert telegram_api.connections <= 8
+
+    def test_failures_are_reported_per_chat(self):
+        from delivery import OutboundQueue, pooled_bot
+
+        with FakeTelegramServer(blocked_chats=[2, 4]) as telegram_api:
+            bot = pooled_bot('1234:abcdefg', pool_size=4,
+                             base_url=telegram_api.base_url)
+            with OutboundQueue(bot, global_rate=1000, retries=2) as queue:
+                queue.broadcast(['1', '2', '3', '4'], 'вердикт')
+                assert queue.flush(timeout=10)
+
+        assert sorted(chat for chat, _ in telegram_api.messages) == [
+            '1', '3']
+        assert sorted(queue.failures) == ['2', '4']
+        assert 'chat not found' in str(queue.failures['2']).lower()
+        assert queue.failed == 2
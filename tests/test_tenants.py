@@ -0,0 +1,150 @@
+import pytest
+import telegram
+from fake_servers import FakePracticumServer, FakeTelegramServer
+from utils import ALWAYS, RecordingBot, StreamedResponse
+
+
+class TestMultiTenantPoller:
+
+    def test_poll_all_uses_tenant_credentials(self, monkeypatch):
+        import homework
+        from tenants import MultiTenantPoller, Tenant, TenantRegistry
+
+        homeworks = [{'homework_name': 'hw', 'status': 'approved'}]
+        monkeypatch.setattr(homework, 'SCOPED_STATUSES', {})
+        registry = TenantRegistry(
+            Tenant(f'student{i}', f'token{i}', 100 + i) for i in range(20))
+        with FakePracticumServer(homeworks=homeworks) as practicum, \
+                FakeTelegramServer() as telegram_api:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            bot = telegram.Bot('1234:abcdefg',
+                               base_url=telegram_api.base_url)
+            with MultiTenantPoller(registry, bot, concurrency=4) as poller:
+                assert poller.poll_all() == 20
+                assert poller.poll_all() == 0
+
+        tokens = {request['headers']['Authorization']
+                  for request in practicum.requests}
+        assert tokens == {f'OAuth token{i}' for i in range(20)}
+        assert practicum.connections <= 4, (
+            'Проверьте, что арендаторы используют общий пул соединений'
+        )
+        assert {chat for chat, _ in telegram_api.messages} == {
+            str(100 + i) for i in range(20)}
+        assert all(tenant.cursor == practicum.current_date
+                   for tenant in registry)
+
+    def test_registry_roundtrip(self, tmp_path):
+        from tenants import Tenant, TenantRegistry
+
+        path = tmp_path / 'tenants.json'
+        registry = TenantRegistry([Tenant('a', 'token-a', 1, cursor=10)])
+        registry.save(path)
+        loaded = TenantRegistry.load(path)
+        assert len(loaded) == 1
+        tenant = loaded.get('a')
+        assert tenant.cursor == 10
+        assert tenant.headers == {'Authorization': 'OAuth token-a'}
+
+    def test_duplicate_tenant(self):
+        from tenants import Tenant, TenantRegistry
+
+        registry = TenantRegistry([Tenant('a', 'token', 1)])
+        with pytest.raises(KeyError):
+            registry.add(Tenant('a', 'other', 2))
+
+    def test_cursor_is_read_after_streamed_homeworks(self, monkeypatch):
+        import homework
+        from tenants import MultiTenantPoller, Tenant, TenantRegistry
+
+        response = StreamedResponse(
+            [{'homework_name': 'hw', 'status': 'approved'}], 5000)
+        monkeypatch.setattr(homework, 'SCOPED_STATUSES', {})
+        monkeypatch.setattr(homework, 'fetch_statuses',
+                            lambda *args: response)
+        tenant = Tenant('student', 'token', 100)
+        with MultiTenantPoller(TenantRegistry([tenant]), RecordingBot(),
+                               concurrency=1) as poller:
+            assert poller.poll_all() == 1
+
+        assert response.events == ['homework', 'current_date']
+        assert tenant.cursor == 5000
+
+    def test_old_statuses_are_forgotten(self, monkeypatch):
+        import homework
+        from tenants import MultiTenantPoller, Tenant, TenantRegistry
+
+        old = ('approved', '2022-01-01T00:00:00Z')
+        monkeypatch.setattr(homework, 'SCOPED_STATUSES', {
+            'alice': {'alice/1': old}, 'bob': {'bob/1': old}})
+
+        def fetch_statuses(from_date, headers, client):
+            if headers['Authorization'] == 'OAuth broken':
+                raise ConnectionError('токен отозван')
+            return {'homeworks': [], 'current_date': 1646092800}
+
+        monkeypatch.setattr(homework, 'fetch_statuses', fetch_statuses)
+        monkeypatch.setattr(homework, 'send_message_to',
+                            lambda bot, chat_id, text: None)
+        registry = TenantRegistry([Tenant('alice', 'token', 100),
+                                   Tenant('bob', 'broken', 101)])
+        with MultiTenantPoller(registry, bot=None, concurrency=1) as poller:
+            poller.poll_all()
+
+        assert homework.SCOPED_STATUSES == {
+            'alice': {}, 'bob': {'bob/1': old}}, (
+            'Проверьте, что статусы арендатора забываются по его курсору, '
+            'а отстающий арендатор не мешает остальным'
+        )
+
+    def test_failed_send_is_not_stored(self, monkeypatch, tmp_path):
+        import homework
+        from state import StateStore
+        from tenants import MultiTenantPoller, Tenant, TenantRegistry
+
+        monkeypatch.setattr(homework, 'fetch_statuses', lambda *args: {
+            'homeworks': [{'id': 1, 'homework_name': 'hw',
+                           'status': 'approved'}],
+            'current_date': 5000})
+        path = str(tmp_path / 'state.sqlite3')
+        bots = [RecordingBot(failures=ALWAYS), RecordingBot()]
+        for bot in bots:
+            monkeypatch.setattr(homework, 'SCOPED_STATUSES', {})
+            registry = TenantRegistry([Tenant('student', 'token', 100)])
+            with StateStore(path) as store, MultiTenantPoller(
+                    registry, bot, concurrency=1, store=store) as poller:
+                poller.poll_all()
+
+        assert bots[1].texts == [homework.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'})], (
+            'Проверьте, что статус сохраняется только после отправки'
+        )
+
+    def test_restart_does_not_resend(self, monkeypatch, tmp_path):
+        import homework
+        from state import StateStore
+        from tenants import MultiTenantPoller, Tenant, TenantRegistry
+
+        bot = RecordingBot()
+        path = str(tmp_path / 'state.sqlite3')
+        with FakePracticumServer(homeworks=[
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved'}],
+                current_date=5000) as practicum:
+            monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+            for _ in range(2):
+                monkeypatch.setattr(homework, 'SCOPED_STATUSES', {})
+                registry = TenantRegistry([Tenant('alice', 'token1', 100),
+                                           Tenant('bob', 'token2', 101)])
+                with StateStore(path) as store, MultiTenantPoller(
+                        registry, bot, concurrency=1,
+                        store=store) as poller:
+                    poller.poll_all()
+
+        assert sorted(chat for chat, _ in bot.messages) == [100, 101], (
+            'Проверьте, что одинаковые работы арендаторов не мешают друг другу'
+        )
+        assert practicum.requests[2]['params']['from_date'] == str(
+            5000 - homework.CURSOR_OVERLAP)
+        with StateStore(path) as store:
+            assert store.load_statuses() == {
+                'alice/1': ('approved', None), 'bob/1': ('approved', None)}
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+
+from fake_servers import FakePracticumServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_trace(path):
+    with open(path, encoding='utf-8') as file:
+        text = file.read().rstrip().rstrip(',')
+    return json.loads(text + ']')
+
+
+class TestTracer:
+
+    def test_nested_spans_in_chrome_format(self, tmp_path):
+        from tracing import Tracer
+
+        path = tmp_path / 'trace.json'
+        tracer = Tracer(str(path))
+
+        @tracer.traced()
+        def parse_status(homework):
+            return homework
+
+        with tracer.span('cycle', cycle=1):
+            with tracer.span('network'):
+                pass
+            parse_status({})
+        tracer.close()
+
+        events = {event['name']: event for event in load_trace(path)}
+        assert set(events) == {'cycle', 'network', 'parse_status'}
+        assert events['cycle']['ph'] == 'X'
+        assert events['cycle']['args'] == {'cycle': 1}
+        assert events['cycle']['dur'] >= events['network']['dur']
+
+    def test_sampling_skips_whole_cycle(self, tmp_path):
+        from tracing import Tracer
+
+        path = tmp_path / 'trace.json'
+        decisions = iter([0.9, 0.1])
+        tracer = Tracer(str(path), sample_rate=0.5,
+                        rng=lambda: next(decisions))
+        for _ in range(2):
+            with tracer.span('cycle'):
+                with tracer.span('network'):
+                    pass
+        tracer.close()
+        assert [event['name'] for event in load_trace(path)] == [
+            'network', 'cycle']
+
+    def test_disabled_tracer_is_noop(self):
+        from tracing import NULL_SPAN, Tracer
+
+        tracer = Tracer(None)
+
+        def func():
+            pass
+
+        assert tracer.traced()(func) is func
+        assert tracer.span('cycle') is NULL_SPAN
+
+    def test_profiler_reports_every_n_cycles(self, caplog):
+        from tracing import Profiler
+
+        profiler = Profiler(every=2)
+        with caplog.at_level('INFO'):
+            for _ in range(4):
+                with profiler:
+                    sorted(range(1000))
+        reports = [record for record in caplog.records
+                   if 'Профиль за 2 циклов' in record.getMessage()]
+        assert len(reports) == 2
+
+    def test_homework_stages_are_traced(self, tmp_path):
+        path = tmp_path / 'trace.json'
+        script = (
+            'import tracing\n'
+            'from alerts import ErrorAggregator\n'
+            'from replay import NullBot\n'
+            'from scheduler import FixedScheduler\n'
+            'from state import StateStore\n'
+            'with tracing.span("cycle"):\n'
+            '    homework.poll_cycle(NullBot(), StateStore(":memory:"),\n'
+            '                        FixedScheduler(0), ErrorAggregator(), 1)\n'
+            'tracing.TRACER.close()\n'
+        )
+        homeworks = [{'homework_name': 'hw', 'status': 'approved'}]
+        with FakePracticumServer(homeworks=homeworks) as practicum:
+            env = dict(os.environ, TRACE_FILE=str(path))
+            subprocess.run(
+                [sys.executable, '-c',
+                 f'import homework; homework.ENDPOINT = '
+                 f'{practicum.endpoint!r}\n' + script],
+                cwd=ROOT, env=env, check=True, capture_output=True)
+        names = [event['name'] for event in load_trace(path)]
+        assert names == ['network', 'json_decode', 'get_api_answer',
+                         'check_response', 'parse_status', 'send_message_to',
+                         'cycle'], (
+            'Проверьте, что в цикле опроса видны разбор и отправка'
+        )
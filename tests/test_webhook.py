@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+import requests
+from utils import RecordingBot
+
+PAYLOAD = {'homeworks': [{'homework_name': 'hw', 'status': 'approved',
+                          'date_updated': '2022-02-13T14:40:57Z'}],
+           'current_date': 1000}
+
+
+class TestWebhookReceiver:
+
+    def test_payload_is_validated_and_queued(self):
+        import homework
+        from webhook import WebhookReceiver
+
+        with WebhookReceiver(homework.check_response, port=0) as receiver:
+            response = requests.post(receiver.url, json=PAYLOAD)
+            assert response.status_code == 202
+            assert receiver.wait(1) == [PAYLOAD['homeworks']]
+            assert receiver.wait(0.01) == []
+
+    @pytest.mark.parametrize('body, code', [
+        (b'not json', 400),
+        (b'[]', 400),
+        (b'{"homeworks": {}}', 400),
+        (b'{"homeworks": null}', 400),
+    ])
+    def test_invalid_payload_is_rejected(self, body, code):
+        import homework
+        from webhook import WebhookReceiver
+
+        with WebhookReceiver(homework.check_response, port=0) as receiver:
+            response = requests.post(receiver.url, data=body)
+            assert response.status_code == code
+            assert receiver.inbox.empty()
+
+    def test_secret_path_and_size_are_checked(self):
+        import homework
+        from webhook import SECRET_HEADER, WebhookReceiver
+
+        with WebhookReceiver(homework.check_response, port=0,
+                             secret='s3cret', max_body_size=200) as receiver:
+            assert requests.post(receiver.url, json=PAYLOAD).status_code == (
+                403)
+            headers = {SECRET_HEADER: 's3cret'}
+            assert requests.post(receiver.url + 'x', json=PAYLOAD,
+                                 headers=headers).status_code == 404
+            assert requests.post(receiver.url, data=b' ' * 201,
+                                 headers=headers).status_code == 413
+            assert requests.post(receiver.url, json=PAYLOAD,
+                                 headers=headers).status_code == 202
+
+
+    @pytest.mark.parametrize('length, code', [
+        (None, 411),
+        ('-5', 400),
+        ('abc', 400),
+    ])
+    def test_content_length_is_checked(self, length, code):
+        import http.client
+
+        import homework
+        from webhook import WebhookReceiver
+
+        with WebhookReceiver(homework.check_response, port=0) as receiver:
+            host, port = receiver.server.server_address
+            connection = http.client.HTTPConnection(host, port, timeout=5)
+            connection.putrequest('POST', receiver.path)
+            if length is not None:
+                connection.putheader('Content-Length', length)
+            connection.endheaders()
+            response = connection.getresponse()
+            connection.close()
+            assert response.status == code
+            assert receiver.inbox.empty()
+
+
+class TestPushMode:
+
+    def test_push_is_delivered_before_next_poll(self, monkeypatch, tmp_path):
+        import homework
+        from alerts import ErrorAggregator
+        from scheduler import FixedScheduler
+        from state import StateStore
+        from webhook import WebhookReceiver
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        bot = RecordingBot()
+        store = StateStore(str(tmp_path / 'state.sqlite3'))
+        with WebhookReceiver(homework.check_response, port=0) as receiver:
+            posted = []
+
+            def push():
+                time.sleep(0.05)
+                posted.append(time.perf_counter())
+                requests.post(receiver.url, json=PAYLOAD)
+                requests.post(receiver.url, json=PAYLOAD)
+
+            thread = threading.Thread(target=push)
+            thread.start()
+            started = time.perf_counter()
+            homework.idle(bot, store, FixedScheduler(0), ErrorAggregator(),
+                          receiver, 0.5)
+            thread.join()
+        store.close()
+
+        assert time.perf_counter() - started >= 0.5, (
+            'Проверьте, что опрос-сверка ждёт полный интервал'
+        )
+        assert len(bot.messages) == 1, (
+            'Проверьте, что повторный push не дублирует сообщение'
+        )
+        assert 'hw' in bot.texts[0]
+        assert bot.sent_at[0] - posted[0] < 0.1
+        assert homework.OLD_STATUSES
+
+    def test_bad_homework_is_reported(self, monkeypatch, tmp_path):
+        import homework
+        from alerts import ErrorAggregator
+        from scheduler import FixedScheduler
+        from state import StateStore
+
+        monkeypatch.setattr(homework, 'OLD_STATUSES', {})
+        bot = RecordingBot()
+        with StateStore(str(tmp_path / 'state.sqlite3')) as store:
+            homework.push_cycle(bot, store, FixedScheduler(0),
+                                ErrorAggregator(),
+                                [{'homework_name': 'hw', 'status': 'x'}])
+        assert len(bot.messages) == 1
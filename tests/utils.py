@@ -1,3 +1,5 @@
+import threading
+import time
 from inspect import signature
 from types import ModuleType
 
@@ -37,3 +39,71 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class FakeClock:
+    """Часы, которые идут только когда тест меняет ``now``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingBot:
+    """Бот, который запоминает сообщения ``(chat_id, text)``.
+
+    Первые ``failures`` отправок завершаются ``NetworkError``; с
+    ``failures=ALWAYS`` сеть недоступна всегда.
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.messages = []
+        self.sent_at = []
+        self.sent = threading.Event()
+
+    def send_message(self, chat_id, text):
+        from telegram.error import NetworkError
+
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise NetworkError('нет сети')
+        self.sent_at.append(time.perf_counter())
+        self.messages.append((chat_id, text))
+        self.sent.set()
+
+    @property
+    def texts(self):
+        return [text for _, text in self.messages]
+
+
+ALWAYS = float('inf')
+
+
+class StreamedResponse:
+    """Ответ, который, как поток, отдаёт работы по одной.
+
+    В ``events`` видно, в каком порядке читали работы и ``current_date``.
+    """
+
+    def __init__(self, homeworks, current_date):
+        self.homeworks = homeworks
+        self.current_date = current_date
+        self.events = []
+
+    def _iter_homeworks(self):
+        for item in self.homeworks:
+            self.events.append('homework')
+            yield item
+
+    def __getitem__(self, key):
+        if key == 'homeworks':
+            return self._iter_homeworks()
+        self.events.append(key)
+        return self.current_date
+
+    def get(self, key, default=None):
+        return self[key]
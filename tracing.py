@@ -0,0 +1,194 @@
+import functools
+import io
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+TRACE_FILE = os.getenv('TRACE_FILE')
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 1))
+PROFILE_EVERY = int(os.getenv('PROFILE_EVERY', 0))
+PROFILE_TOP = 20
+
+
+class NullSpan:
+    """Пустой спан, когда трассировка выключена или цикл не попал в выборку."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class SkippedSpan:
+    """Корневой спан вне выборки: вложенные спаны тоже не пишутся."""
+
+    __slots__ = ('tracer',)
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def __enter__(self):
+        self.tracer._stack().append(None)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._stack().pop()
+        return False
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'args', 'started', 'root')
+
+    def __init__(self, tracer, name, args, root=False):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.root = root
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        finished = time.perf_counter_ns()
+        self.tracer._stack().pop()
+        if exc_type is not None:
+            self.args['error'] = f'{exc_type.__name__}: {exc}'
+        self.tracer._emit(self, finished)
+        return False
+
+
+class Tracer:
+    """Трассировка стадий цикла в формате Chrome Trace Event.
+
+    Файл открывается как JSON-массив и дописывается по событию на строку;
+    его понимают ``chrome://tracing`` и Perfetto. Решение о выборке
+    принимается для корневого спана и наследуется вложенными.
+    """
+
+    def __init__(self, path=TRACE_FILE, sample_rate=TRACE_SAMPLE_RATE,
+                 rng=random.random):
+        self.enabled = path is not None
+        self.sample_rate = sample_rate
+        self.rng = rng
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+        if self.enabled:
+            self._file = open(path, 'w', encoding='utf-8')
+            self._file.write('[\n')
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **args):
+        """Контекстный менеджер для замера блока кода."""
+        if not self.enabled:
+            return NULL_SPAN
+        stack = self._stack()
+        if not stack:
+            if self.rng() >= self.sample_rate:
+                return SkippedSpan(self)
+            return Span(self, name, args, root=True)
+        if stack[-1] is None:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def traced(self, name=None):
+        """Декоратор; при выключенной трассировке функция не меняется."""
+        def decorator(func):
+            if not self.enabled:
+                return func
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _emit(self, span, finished):
+        event = {
+            'name': span.name,
+            'ph': 'X',
+            'ts': span.started // 1000,
+            'dur': (finished - span.started) // 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if span.args:
+            event['args'] = span.args
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + ',\n')
+            if span.root:
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.enabled = False
+
+
+class Profiler:
+    """Профилирование циклов через cProfile.
+
+    Раз в ``every`` циклов пишет в лог самые затратные функции и
+    начинает замер заново; при ``every=0`` ничего не делает.
+    """
+
+    def __init__(self, every=PROFILE_EVERY, top=PROFILE_TOP):
+        self.every = every
+        self.top = top
+        self.cycles = 0
+        self._profile = self._new_profile() if every else None
+
+    def __enter__(self):
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._profile is None:
+            return False
+        self._profile.disable()
+        self.cycles += 1
+        if self.cycles % self.every == 0:
+            logging.info(
+                'Профиль за %s циклов:\n%s', self.every, self.report())
+            self._profile = self._new_profile()
+        return False
+
+    def _new_profile(self):
+        import cProfile
+
+        return cProfile.Profile()
+
+    def report(self):
+        """Самые затратные функции по суммарному времени."""
+        import pstats
+
+        output = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=output)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        return output.getvalue()
+
+
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
@@ -0,0 +1,128 @@
+import hmac
+import json
+import os
+import queue
+import threading
+
+from metrics import WEBHOOK_REQUESTS
+
+WEBHOOK_PORT = os.getenv('WEBHOOK_PORT')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+WEBHOOK_RECONCILE_TIME = float(os.getenv('WEBHOOK_RECONCILE_TIME', 600))
+MAX_BODY_SIZE = 1024 * 1024
+SECRET_HEADER = 'X-Webhook-Secret'
+SHUTDOWN_POLL_INTERVAL = 0.05
+
+
+class WebhookReceiver:
+    """Приём изменений статусов по HTTP вместо опроса API.
+
+    Тело ``POST`` имеет тот же вид, что и ответ API. Оно проверяется
+    функцией ``validate`` прямо в потоке сервера, а список работ
+    кладётся в очередь; разбирает и отправляет их основной цикл через
+    ``wait()``, поэтому состояние бота меняется только в одном потоке.
+    """
+
+    def __init__(self, validate, port=WEBHOOK_PORT, host=WEBHOOK_HOST,
+                 path=WEBHOOK_PATH, secret=WEBHOOK_SECRET,
+                 max_body_size=MAX_BODY_SIZE):
+        self.validate = validate
+        self.port = int(port)
+        self.host = host
+        self.path = path
+        self.secret = secret
+        self.max_body_size = max_body_size
+        self.inbox = queue.Queue()
+        self.server = None
+
+    def accept(self, headers, body):
+        """Код ответа HTTP для входящего запроса."""
+        if self.secret is not None and not hmac.compare_digest(
+                headers.get(SECRET_HEADER, '').encode(),
+                self.secret.encode()):
+            return 403
+        try:
+            homeworks = self.validate(json.loads(body))
+            if homeworks is None:
+                raise TypeError('Нет списка работ')
+            homeworks = list(homeworks)
+        except Exception:
+            return 400
+        self.inbox.put(homeworks)
+        return 202
+
+    def wait(self, timeout):
+        """Пакеты работ, пришедшие за ``timeout`` секунд.
+
+        Возвращается сразу, как только пришёл первый пакет; пустой
+        список означает, что за это время ничего не пришло.
+        """
+        try:
+            batches = [self.inbox.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                batches.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return batches
+
+    def start(self):
+        """HTTP-сервер в фоновом потоке."""
+        from http.server import ThreadingHTTPServer
+
+        self.server = ThreadingHTTPServer(
+            (self.host, self.port), webhook_handler(self))
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='webhook',
+                         args=(SHUTDOWN_POLL_INTERVAL,), daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}{self.path}'
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def webhook_handler(receiver):
+    """Класс обработчика запросов для ``receiver``."""
+    from http.server import BaseHTTPRequestHandler
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            length = self.headers.get('Content-Length')
+            if self.path.split('?')[0] != receiver.path:
+                code = 404
+            elif length is None:
+                code = 411
+            elif not length.isdigit():
+                code = 400
+            elif int(length) > receiver.max_body_size:
+                code = 413
+            else:
+                code = receiver.accept(
+                    self.headers, self.rfile.read(int(length)))
+            WEBHOOK_REQUESTS.labels(code).inc()
+            self.send_response(code)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    return WebhookHandler